@@ -1,5 +1,35 @@
+import codecs
+import fnmatch
+import hashlib
+import json
 import os
+import re
 import shutil
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Taille des blocs lus/écrits: la mémoire par fichier reste bornée quelle que soit sa taille
+CHUNK_SIZE = 1024 * 1024
+MAX_WORKERS = 8
+# Manifeste du mode incrémental, conservé dans le dossier de destination
+MANIFEST_NAME = '.copy_manifest.json'
+
+# Règles de sélection: la première règle dont un motif include correspond au nom du fichier s'applique.
+# recursive=False limite la règle au dossier source lui-même; min_size/max_size en octets.
+DEFAULT_RULES = [
+    {'include': ('*.h', '*.cpp', '*.ino'), 'recursive': False},
+    {'include': ('*.py', '*.md', '*.env', '*.ipynb'), 'exclude': ('__init__.py',), 'recursive': True,
+     'min_size': 1},
+]
+# Dossiers jamais parcourus
+IGNORED_DIRS = ('node_modules', '.git', 'build', '__pycache__')
+# Estimation grossière pour les budgets en tokens du mode bundle
+BYTES_PER_TOKEN = 4
+# Magasin adressé par contenu: blobs/<2 premiers caractères du hash>/<hash>, snapshots/<nom>.json
+BLOBS_FOLDER = 'blobs'
+SNAPSHOTS_FOLDER = 'snapshots'
 
 def create_project_folder_on_desktop(folder_name):
     """
@@ -11,60 +41,649 @@ def create_project_folder_on_desktop(folder_name):
         os.makedirs(project_folder_path)
     return project_folder_path
 
-def copy_and_rename_files(source_folder, destination_folder):
+def text_file_name(file_name):
     """
-    Copy and rename .h, .cpp, and .ino files from the source folder to the destination folder.
+    Name of the .txt copy of a file: <base>_<extension>.txt
+    """
+    file_base_name, file_extension = os.path.splitext(file_name)
+    return f"{file_base_name}_{file_extension[1:]}.txt"
+
+def is_valid_utf8(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Check block by block that a file is valid UTF-8, without loading it in memory.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with open(file_path, 'rb') as file:
+            while chunk := file.read(chunk_size):
+                decoder.decode(chunk)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def text_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Yield the content of a file as UTF-8 bytes, chunk by chunk, invalid bytes ignored.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(chunk_size):
+            yield decoder.decode(chunk).encode('utf-8')
+    yield decoder.decode(b'', final=True).encode('utf-8')
+
+def copy_as_text(file_path, new_file_path, chunk_size=CHUNK_SIZE, zero_copy=True):
+    """
+    Copy a file as UTF-8 text in bounded chunks and return the number of bytes written.
+    Valid UTF-8 files need no transcoding and are copied by shutil.copyfile (kernel copy
+    where the platform supports it); other files are decoded incrementally, invalid bytes ignored.
+    """
+    if zero_copy and is_valid_utf8(file_path, chunk_size):
+        shutil.copyfile(file_path, new_file_path)
+        return os.path.getsize(new_file_path)
+
+    written = 0
+    with open(new_file_path, 'wb') as new_file:
+        for chunk in text_chunks(file_path, chunk_size):
+            written += new_file.write(chunk)
+    return written
+
+def unique_destinations(jobs):
+    """
+    Keep a single job per destination path: when several sources map to the same output
+    (same file name in different subfolders), the last one wins, as with sequential copies.
+    Return (jobs, collisions) where collisions lists the (source path, destination path) dropped.
+    """
+    kept = {}
+    collisions = []
+    for file_path, new_file_path in jobs:
+        key = os.path.normcase(os.path.abspath(new_file_path))
+        if key in kept:
+            collisions.append(kept[key])
+        kept[key] = (file_path, new_file_path)
+    return list(kept.values()), collisions
+
+def copy_files(jobs, max_workers=MAX_WORKERS, chunk_size=CHUNK_SIZE, zero_copy=True, progress=True, copied=None):
     """
-    for file_name in os.listdir(source_folder):
-        if file_name.endswith(('.h', '.cpp', '.ino')):
-            file_path = os.path.join(source_folder, file_name)
+    Copy a list of (source path, destination path) pairs on a bounded thread pool.
+    Return the statistics of the run (files, bytes, errors, collisions, seconds).
+    Successful pairs are appended to the optional `copied` list.
+    """
+    stats = {'files': 0, 'bytes': 0, 'errors': 0, 'collisions': 0, 'seconds': 0.0}
+    start = time.perf_counter()
+    # Deux copies simultanées vers le même fichier mélangeraient leurs octets
+    jobs, collisions = unique_destinations(jobs)
+    for file_path, new_file_path in collisions:
+        print(f"Output name collision, {file_path} skipped: {os.path.basename(new_file_path)} is written from another file")
+    stats['collisions'] = len(collisions)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(copy_as_text, file_path, new_file_path, chunk_size, zero_copy): (file_path, new_file_path)
+            for file_path, new_file_path in jobs
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
             try:
-                # Ouverture du fichier avec gestion d'encodage UTF-8 et erreurs ignorées
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                    content = file.read()
-                
-                # Extraction du nom de base et extension du fichier
-                file_base_name, file_extension = os.path.splitext(file_name)
-                
-                # Nouveau nom de fichier avec le suffixe de l'extension
-                new_file_name = f"{file_base_name}_{file_extension[1:]}.txt"
-                new_file_path = os.path.join(destination_folder, new_file_name)
-                
-                # Écriture du contenu dans le nouveau fichier
-                with open(new_file_path, 'w', encoding='utf-8') as new_file:
-                    new_file.write(content)
-                
+                stats['bytes'] += future.result()
+                stats['files'] += 1
+                if copied is not None:
+                    copied.append(futures[future])
             except Exception as e:
-                print(f"Error processing file {file_name}: {e}")
+                stats['errors'] += 1
+                print(f"Error processing file {os.path.basename(futures[future][0])}: {e}")
+            if progress:
+                print(f"\r{done}/{len(futures)} files", end='', flush=True)
+    if progress and futures:
+        print()
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+def print_report(stats):
+    """
+    Print the throughput of a run: files/s and MB/s.
+    """
+    seconds = max(stats['seconds'], 1e-9)
+    megabytes = stats['bytes'] / (1024 * 1024)
+    print(f"{stats['files']} files ({megabytes:.1f} MB) copied in {stats['seconds']:.2f} s, "
+          f"{stats['files'] / seconds:.1f} files/s, {megabytes / seconds:.1f} MB/s, {stats['errors']} errors")
+    if stats.get('collisions'):
+        print(f"{stats['collisions']} files skipped because another file has the same output name")
+    if 'skipped' in stats:
+        print(f"{stats['files']} written, {stats['skipped']} unchanged skipped, "
+              f"{stats['orphans']} orphan outputs ({stats['pruned']} deleted)")
+    if 'dedup_rate' in stats:
+        print(f"Snapshot {stats['snapshot']}: {stats['unique']} unique contents, {stats['files']} blobs written, "
+              f"{stats['deduplicated']} deduplicated ({stats['dedup_rate']:.0%})")
+    if 'scan_entries' in stats:
+        print(f"Scan: {stats['scan_entries']} entries visited in {stats['scan_seconds']:.2f} s")
+
+def _gitignore_regex(pattern):
+    """
+    Translate a .gitignore glob (relative to its folder) into a regular expression on relative paths.
+    """
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 1:]:
+            end = pattern.index(']', i + 1)
+            regex += '[' + pattern[i + 1:end].replace('!', '^', 1) + ']'
+            i = end + 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(regex + '$')
+
+def load_gitignore(folder, relative_folder=''):
+    """
+    Read the .gitignore of a folder as a list of (regex, negated, directory only, anchored) rules.
+    Patterns containing a slash are anchored to the folder; others match a name at any depth.
+    """
+    rules = []
+    try:
+        with open(os.path.join(folder, '.gitignore'), 'r', encoding='utf-8', errors='ignore') as file:
+            lines = file.read().splitlines()
+    except OSError:
+        return rules
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        negated = line.startswith('!')
+        line = line[1:] if negated else line
+        directory_only = line.endswith('/')
+        line = line.rstrip('/')
+        anchored = '/' in line
+        line = line.lstrip('/')
+        if relative_folder and anchored:
+            line = f"{relative_folder}/{line}"
+        rules.append((_gitignore_regex(line), negated, directory_only, anchored))
+    return rules
 
-def copy_and_rename_additional_files(source_folder, destination_folder):
+def is_ignored(relative_path, is_dir, gitignore_rules):
+    """
+    Apply .gitignore rules in order: the last matching rule wins.
+    """
+    ignored = False
+    name = relative_path.rsplit('/', 1)[-1]
+    for regex, negated, directory_only, anchored in gitignore_rules:
+        if directory_only and not is_dir:
+            continue
+        if regex.match(relative_path if anchored else name):
+            ignored = not negated
+    return ignored
+
+def _matching_rule(name, depth, rules):
+    for rule in rules:
+        if depth > 0 and not rule.get('recursive', False):
+            continue
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in rule['include']):
+            if any(fnmatch.fnmatchcase(name, pattern) for pattern in rule.get('exclude', ())):
+                return None
+            return rule
+    return None
+
+def scan_files(source_folder, rules=DEFAULT_RULES, ignored_dirs=IGNORED_DIRS, use_gitignore=True):
+    """
+    Walk the source folder once with os.scandir and return (files, scan statistics).
+    files is a list of (path, relative path, size, mtime_ns) selected by the rules. Ignored
+    folders and .gitignore matches are pruned before being entered; size and mtime come from
+    the stat cached by the scandir entry (read once per selected file, free on Windows) so
+    callers never stat the file again.
+    """
+    start = time.perf_counter()
+    stats = {'entries': 0, 'directories': 0, 'pruned': 0}
+    recursive = any(rule.get('recursive', False) for rule in rules)
+    files = []
+    stack = [(source_folder, '', load_gitignore(source_folder) if use_gitignore else [])]
+    while stack:
+        folder, relative_folder, gitignore_rules = stack.pop()
+        stats['directories'] += 1
+        depth = relative_folder.count('/') + 1 if relative_folder else 0
+        try:
+            entries = list(os.scandir(folder))
+        except OSError as e:
+            print(f"Error scanning folder {folder}: {e}")
+            continue
+        for entry in entries:
+            stats['entries'] += 1
+            relative_path = f"{relative_folder}/{entry.name}" if relative_folder else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not recursive or entry.name in ignored_dirs or is_ignored(relative_path, True, gitignore_rules):
+                    stats['pruned'] += 1
+                    continue
+                child_rules = gitignore_rules
+                if use_gitignore:
+                    child_rules = gitignore_rules + load_gitignore(entry.path, relative_path)
+                stack.append((entry.path, relative_path, child_rules))
+                continue
+            if not entry.is_file():
+                continue
+            rule = _matching_rule(entry.name, depth, rules)
+            if rule is None or is_ignored(relative_path, False, gitignore_rules):
+                continue
+            stat = entry.stat()
+            if stat.st_size < rule.get('min_size', 0) or stat.st_size > rule.get('max_size', stat.st_size):
+                continue
+            files.append((entry.path, relative_path, stat.st_size, stat.st_mtime_ns))
+    stats['matched'] = len(files)
+    stats['seconds'] = time.perf_counter() - start
+    return files, stats
+
+def jobs_for(files, destination_folder):
+    """
+    (source path, destination path) pairs of scanned files.
+    """
+    return [(file_path, os.path.join(destination_folder, text_file_name(os.path.basename(file_path))))
+            for file_path, *_ in files]
+
+def list_jobs(source_folder, destination_folder, rules=DEFAULT_RULES, **scan_options):
+    """
+    List the (source path, destination path) pairs selected by the rules, with the scan statistics.
+    """
+    files, scan_stats = scan_files(source_folder, rules, **scan_options)
+    return jobs_for(files, destination_folder), scan_stats
+
+def copy_and_rename_files(source_folder, destination_folder, max_workers=MAX_WORKERS):
+    """
+    Copy and rename .h, .cpp, and .ino files from the source folder to the destination folder.
+    """
+    jobs, _ = list_jobs(source_folder, destination_folder, DEFAULT_RULES[:1])
+    return copy_files(jobs, max_workers=max_workers)
+
+def copy_and_rename_additional_files(source_folder, destination_folder, max_workers=MAX_WORKERS):
     """
     Recursively copy and rename .py, .md, .env, and .ipynb files from the source folder 
     and its subfolders to the destination folder, excluding __init__.py and files of 0 KB.
     """
-    for root, dirs, files in os.walk(source_folder):
-        for file_name in files:
-            if file_name.endswith(('.py', '.md', '.env', '.ipynb')) and file_name != "__init__.py":
-                file_path = os.path.join(root, file_name)
-                if os.path.getsize(file_path) > 0:  # Ignore files of size 0 Ko
-                    try:
-                        # Ouverture du fichier avec gestion d'encodage UTF-8 et erreurs ignorées
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                            content = file.read()
-                        
-                        # Extraction du nom de base et extension du fichier
-                        file_base_name, file_extension = os.path.splitext(file_name)
-                        
-                        # Nouveau nom de fichier avec le suffixe de l'extension
-                        new_file_name = f"{file_base_name}_{file_extension[1:]}.txt"
-                        new_file_path = os.path.join(destination_folder, new_file_name)
-                        
-                        # Écriture du contenu dans le nouveau fichier
-                        with open(new_file_path, 'w', encoding='utf-8') as new_file:
-                            new_file.write(content)
-                    
-                    except Exception as e:
-                        print(f"Error processing file {file_name}: {e}")
+    jobs, _ = list_jobs(source_folder, destination_folder, DEFAULT_RULES[1:])
+    return copy_files(jobs, max_workers=max_workers)
+
+def file_hash(file_path, chunk_size=CHUNK_SIZE):
+    """
+    SHA-256 of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(destination_folder):
+    """
+    Load the manifest of the destination folder: {source path: {output, size, mtime_ns, hash}}.
+    """
+    manifest_path = os.path.join(destination_folder, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError) as e:
+        print(f"Unreadable manifest, full copy: {e}")
+        return {}
+    # Entrées d'un format inconnu ignorées: les fichiers correspondants sont simplement recopiés
+    return {source: entry for source, entry in manifest.items() if isinstance(entry, dict) and 'output' in entry}
+
+def save_manifest(destination_folder, manifest):
+    """
+    Write the manifest atomically (temporary file then replace).
+    """
+    manifest_path = os.path.join(destination_folder, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+def sync_files(source_folder, destination_folder, use_hash=False, prune=False, max_workers=MAX_WORKERS,
+               rules=DEFAULT_RULES, **scan_options):
+    """
+    Incremental copy: only new or modified files (size or mtime changed) are written.
+    With use_hash, a file whose mtime changed but whose content hash did not is skipped too.
+    The manifest is keyed by source path; sources sharing an output name with another file are
+    reported as collisions (the last one is kept) instead of being rewritten on every run.
+    Outputs whose source under source_folder disappeared are reported, or deleted with prune.
+    Return the run statistics, including skipped, collisions, orphans and pruned counts.
+    """
+    manifest = load_manifest(destination_folder)
+    files, scan_stats = scan_files(source_folder, rules, **scan_options)
+    scanned = {file_path: (size, mtime_ns) for file_path, _, size, mtime_ns in files}
+    all_jobs = jobs_for(files, destination_folder)
+    jobs, collisions = unique_destinations(all_jobs)
+    for file_path, new_file_path in collisions:
+        print(f"Output name collision, {file_path} skipped: {os.path.basename(new_file_path)} is written from another file")
+        # Une source évincée n'a pas de sortie propre: son ancienne entrée ne doit plus la représenter
+        manifest.pop(os.path.abspath(file_path), None)
+
+    owners = {entry['output']: source for source, entry in manifest.items()}
+    pending = []
+    entries = {}
+    skipped = 0
+    for file_path, new_file_path in jobs:
+        source = os.path.abspath(file_path)
+        size, mtime_ns = scanned[file_path]
+        entry = {'output': os.path.basename(new_file_path), 'size': size, 'mtime_ns': mtime_ns}
+        previous = manifest.get(source)
+        unchanged = (
+            previous is not None and previous['output'] == entry['output'] and previous['size'] == entry['size']
+            and os.path.exists(new_file_path)
+        )
+        if unchanged and previous['mtime_ns'] != entry['mtime_ns']:
+            unchanged = use_hash and previous.get('hash') is not None and previous['hash'] == file_hash(file_path)
+        if unchanged:
+            skipped += 1
+            manifest[source] = {**previous, 'mtime_ns': entry['mtime_ns']}
+            continue
+        # La sortie peut avoir été écrite depuis une autre source lors d'un run précédent
+        owner = owners.get(entry['output'])
+        if owner is not None and owner != source:
+            manifest.pop(owner, None)
+        pending.append((file_path, new_file_path))
+        entries[source] = entry
+
+    copied = []
+    stats = copy_files(pending, max_workers=max_workers, copied=copied)
+    for file_path, _ in copied:
+        entry = entries[os.path.abspath(file_path)]
+        if use_hash:
+            entry['hash'] = file_hash(file_path)
+        manifest[os.path.abspath(file_path)] = entry
+
+    # Sorties dont la source (sous ce dossier source) n'existe plus
+    sources = {os.path.abspath(file_path) for file_path, _ in all_jobs}
+    written = {os.path.basename(new_file_path) for _, new_file_path in jobs}
+    root = os.path.join(os.path.abspath(source_folder), '')
+    orphans = [source for source in manifest if source.startswith(root) and source not in sources]
+    pruned = 0
+    for source in orphans:
+        output = manifest[source]['output']
+        if prune:
+            output_path = os.path.join(destination_folder, output)
+            if output not in written and os.path.exists(output_path):
+                os.remove(output_path)
+            del manifest[source]
+            pruned += 1
+        else:
+            print(f"Orphan output (source removed): {output}")
+
+    save_manifest(destination_folder, manifest)
+    stats.update({'skipped': skipped, 'collisions': len(collisions), 'orphans': len(orphans), 'pruned': pruned,
+                  'scan_entries': scan_stats['entries'], 'scan_seconds': scan_stats['seconds']})
+    return stats
+
+# Extensions des archives tar et mode d'écriture correspondant
+TAR_MODES = {'.tar': 'w', '.tar.gz': 'w:gz', '.tgz': 'w:gz', '.tar.bz2': 'w:bz2', '.tar.xz': 'w:xz'}
+
+def _archive_extension(bundle_path):
+    name = os.path.basename(bundle_path).lower()
+    for extension in sorted(TAR_MODES, key=len, reverse=True):
+        if name.endswith(extension):
+            return bundle_path[len(bundle_path) - len(extension):]
+    if '.tar.' in name:
+        raise ValueError(f"Unsupported tar compression: {bundle_path} (use one of {', '.join(TAR_MODES)})")
+    return os.path.splitext(bundle_path)[1]
+
+def _part_path(bundle_path, part, split):
+    if not split:
+        return bundle_path
+    extension = _archive_extension(bundle_path)
+    return f"{bundle_path[:len(bundle_path) - len(extension)]}.part{part:03d}{extension}"
+
+def _round_up(size, block):
+    return -(-size // block) * block
+
+def _text_header(relative_path):
+    return f"===== {relative_path} =====\n".encode('utf-8')
+
+def _tar_info(relative_path, size, mtime_ns):
+    """
+    Tar header of a file, built from the scan (no extra stat); its encoded length is exact.
+    """
+    info = tarfile.TarInfo(relative_path)
+    info.size = size
+    info.mtime = mtime_ns // 1_000_000_000
+    info.mode = 0o644
+    return info
+
+def _entry_cost(fmt, item):
+    """
+    Upper bound of the bytes an item adds to a part, overhead included: path header and
+    separator (text), tar header and block padding, or zip local header, data descriptor,
+    central directory entry and worst-case deflate expansion.
+    """
+    _, relative_path, size, mtime_ns = item
+    if fmt == 'text':
+        return len(_text_header(relative_path)) + size + 1
+    if fmt == 'tar':
+        header = _tar_info(relative_path, size, mtime_ns).tobuf(tarfile.PAX_FORMAT, 'utf-8', 'surrogateescape')
+        return len(header) + _round_up(size, tarfile.BLOCKSIZE)
+    # En-tête local (30) + extra zip64 (20) + descripteur (24) + entrée centrale (46) + extra zip64 (28),
+    # nom écrit deux fois, et 5 octets par bloc deflate stocké si les données sont incompressibles
+    name = len(relative_path.encode('utf-8'))
+    return size + 5 * (size // 16383 + 1) + 2 * name + 30 + 20 + 24 + 46 + 28
+
+# Octets fixes par partie: blocs de fin du tar, fin du répertoire central zip (avec zip64)
+PART_OVERHEAD = {'text': 0, 'tar': 2 * tarfile.BLOCKSIZE, 'zip': 22 + 56 + 20}
+
+def _split_parts(files, max_bytes, fmt):
+    """
+    Group scanned items into consecutive parts whose written size stays within max_bytes,
+    overhead included (a single item larger than the budget gets a part of its own).
+    A plain tar is padded to a whole record (tarfile.RECORDSIZE), which is counted too;
+    for compressed tars the budget bounds the uncompressed archive.
+    """
+    record = tarfile.RECORDSIZE if fmt == 'tar' else 1
+    parts, current, used = [], [], PART_OVERHEAD[fmt]
+    for item in files:
+        cost = _entry_cost(fmt, item)
+        if current and max_bytes is not None and _round_up(used + cost, record) > max_bytes:
+            parts.append(current)
+            current, used = [], PART_OVERHEAD[fmt]
+        current.append(item)
+        used += cost
+    if current:
+        parts.append(current)
+    return parts
+
+def _write_text_part(part_path, files, chunk_size, index):
+    """
+    Concatenate files into one text file, each preceded by a path header.
+    The offset and length of each content are added to the index.
+    """
+    written = 0
+    with open(part_path, 'wb', buffering=chunk_size) as bundle:
+        for file_path, relative_path, *_ in files:
+            written += bundle.write(_text_header(relative_path))
+            offset = written
+            for chunk in text_chunks(file_path, chunk_size):
+                written += bundle.write(chunk)
+            index.append({'path': relative_path, 'part': os.path.basename(part_path),
+                          'offset': offset, 'length': written - offset})
+            written += bundle.write(b"\n")
+    return written
+
+def _write_archive_part(part_path, files, fmt, chunk_size):
+    """
+    Stream files into a tar (compressed according to its extension) or zip archive under their relative path.
+    """
+    if fmt == 'tar':
+        mode = TAR_MODES.get(_archive_extension(part_path).lower(), 'w')
+        with tarfile.open(part_path, mode, bufsize=chunk_size, format=tarfile.PAX_FORMAT) as archive:
+            for file_path, relative_path, size, mtime_ns in files:
+                with open(file_path, 'rb') as file:
+                    archive.addfile(_tar_info(relative_path, size, mtime_ns), file)
+    else:
+        with zipfile.ZipFile(part_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for file_path, relative_path, *_ in files:
+                with open(file_path, 'rb') as file, archive.open(relative_path, 'w', force_zip64=True) as member:
+                    shutil.copyfileobj(file, member, chunk_size)
+    return os.path.getsize(part_path)
+
+def write_bundle(source_folder, bundle_path, fmt='text', max_bytes=None, max_tokens=None,
+                 rules=DEFAULT_RULES, chunk_size=CHUNK_SIZE, **scan_options):
+    """
+    Write all the selected files into a single output instead of one .txt per file.
+    fmt='text': one concatenated text file with path headers, plus a <bundle>.index.json
+    giving the part, byte offset and length of each file; fmt='tar' (.tar, .tar.gz, .tgz,
+    .tar.bz2 or .tar.xz, compressed accordingly) or 'zip': an archive.
+    Relative paths are kept, so files with the same name in different folders do not collide.
+    max_bytes or max_tokens (about BYTES_PER_TOKEN bytes per token) splits the bundle into
+    numbered parts, headers and archive overhead included. Return the run statistics.
+    """
+    if fmt not in ('text', 'tar', 'zip'):
+        raise ValueError(f"Unknown bundle format: {fmt}")
+    if fmt == 'tar':
+        _archive_extension(bundle_path)
+    start = time.perf_counter()
+    files, scan_stats = scan_files(source_folder, rules, **scan_options)
+
+    budget = max_bytes
+    if max_tokens is not None:
+        token_bytes = max_tokens * BYTES_PER_TOKEN
+        budget = token_bytes if budget is None else min(budget, token_bytes)
+    parts = _split_parts(files, budget, fmt)
+
+    stats = {'files': 0, 'bytes': 0, 'errors': 0, 'seconds': 0.0}
+    index = []
+    for number, part in enumerate(parts, start=1):
+        part_path = _part_path(bundle_path, number, len(parts) > 1)
+        try:
+            if fmt == 'text':
+                stats['bytes'] += _write_text_part(part_path, part, chunk_size, index)
+            else:
+                stats['bytes'] += _write_archive_part(part_path, part, fmt, chunk_size)
+            stats['files'] += len(part)
+        except Exception as e:
+            stats['errors'] += len(part)
+            print(f"Error writing bundle {os.path.basename(part_path)}: {e}")
+
+    if fmt == 'text':
+        with open(bundle_path + '.index.json', 'w', encoding='utf-8') as file:
+            json.dump(index, file, indent=1)
+    stats.update({'parts': len(parts), 'scan_entries': scan_stats['entries'], 'scan_seconds': scan_stats['seconds'],
+                  'seconds': time.perf_counter() - start})
+    return stats
+
+def blob_path(store_folder, digest):
+    """
+    Path of the blob of a content hash in the store.
+    """
+    return os.path.join(store_folder, BLOBS_FOLDER, digest[:2], digest)
+
+def text_hash(file_path, chunk_size=CHUNK_SIZE):
+    """
+    SHA-256 of the text written by copy_as_text (identical to the raw hash for valid UTF-8 files),
+    so that a blob's content always matches its address.
+    """
+    digest = hashlib.sha256()
+    for chunk in text_chunks(file_path, chunk_size):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_files(file_paths, max_workers=MAX_WORKERS, chunk_size=CHUNK_SIZE):
+    """
+    Hash the text content of files on a bounded thread pool; return {path: SHA-256}
+    (files that fail are reported and left out).
+    """
+    hashes = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(text_hash, file_path, chunk_size): file_path for file_path in file_paths}
+        for future in as_completed(futures):
+            try:
+                hashes[futures[future]] = future.result()
+            except Exception as e:
+                print(f"Error processing file {os.path.basename(futures[future])}: {e}")
+    return hashes
+
+def store_snapshot(source_folder, store_folder, name=None, max_workers=MAX_WORKERS, rules=DEFAULT_RULES,
+                   **scan_options):
+    """
+    Add a snapshot of the source folder to a content-addressed store.
+    Files are hashed in parallel; each distinct content is written once as a text blob and the
+    snapshot is a manifest {relative path: hash}. Files whose blob could not be written are
+    left out of the snapshot. Return the run statistics, including the deduplication rate
+    (share of the snapshot's files whose content was already stored or seen in the snapshot).
+    """
+    start = time.perf_counter()
+    name = name or time.strftime('%Y%m%d-%H%M%S')
+    files, scan_stats = scan_files(source_folder, rules, **scan_options)
+    hashes = hash_files([file_path for file_path, *_ in files], max_workers=max_workers)
+
+    # Un seul blob par contenu, et seulement s'il n'est pas déjà dans le magasin
+    pending = {}
+    stored = set()
+    for file_path, *_ in files:
+        digest = hashes.get(file_path)
+        if digest is None or digest in pending or digest in stored:
+            continue
+        if os.path.exists(blob_path(store_folder, digest)):
+            stored.add(digest)
+        else:
+            pending[digest] = file_path
+    for digest in pending:
+        os.makedirs(os.path.dirname(blob_path(store_folder, digest)), exist_ok=True)
+
+    # Écriture dans un fichier temporaire puis renommage: un blob présent est toujours complet
+    copied = []
+    stats = copy_files([(file_path, blob_path(store_folder, digest) + '.tmp') for digest, file_path in pending.items()],
+                       max_workers=max_workers, copied=copied)
+    for _, temporary_path in copied:
+        os.replace(temporary_path, temporary_path[:-len('.tmp')])
+        stored.add(os.path.basename(temporary_path)[:-len('.tmp')])
+
+    # Seuls les fichiers dont le blob existe entrent dans le snapshot
+    snapshot = {
+        'source': os.path.abspath(source_folder),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'files': {relative_path: hashes[file_path] for file_path, relative_path, *_ in files
+                  if hashes.get(file_path) in stored}
+    }
+    os.makedirs(os.path.join(store_folder, SNAPSHOTS_FOLDER), exist_ok=True)
+    with open(os.path.join(store_folder, SNAPSHOTS_FOLDER, f"{name}.json"), 'w', encoding='utf-8') as file:
+        json.dump(snapshot, file, indent=1, sort_keys=True)
+
+    total = len(snapshot['files'])
+    written = len(copied)
+    stats.update({
+        'snapshot': name,
+        'unique': len(set(snapshot['files'].values())),
+        'deduplicated': total - written,
+        'dedup_rate': (total - written) / total if total else 0.0,
+        'scan_entries': scan_stats['entries'],
+        'scan_seconds': scan_stats['seconds'],
+        'seconds': time.perf_counter() - start
+    })
+    return stats
+
+def materialize_snapshot(store_folder, name, target_folder):
+    """
+    Recreate a normal folder view of a snapshot (<relative folder>/<base>_<ext>.txt) using hard links
+    to the blobs, or copies where hard links are not supported. Return the number of files created.
+    """
+    with open(os.path.join(store_folder, SNAPSHOTS_FOLDER, f"{name}.json"), 'r', encoding='utf-8') as file:
+        snapshot = json.load(file)
+    created = 0
+    for relative_path, digest in snapshot['files'].items():
+        folder, file_name = os.path.split(relative_path)
+        target_path = os.path.join(target_folder, folder, text_file_name(file_name))
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        try:
+            os.link(blob_path(store_folder, digest), target_path)
+        except OSError:
+            shutil.copyfile(blob_path(store_folder, digest), target_path)
+        created += 1
+    return created
 
 def main():
     """
@@ -87,10 +706,15 @@ def main():
     
     destination_folder = create_project_folder_on_desktop("Project Copy txt")
 
-    copy_and_rename_files(source_folder, destination_folder)
-    copy_and_rename_additional_files(source_folder, destination_folder)
+    # Mode incrémental: seuls les fichiers nouveaux ou modifiés depuis la dernière copie sont réécrits
+    stats = sync_files(source_folder, destination_folder, use_hash=False, prune=False)
+    # Mode bundle: tout l'arbre dans un seul fichier texte ('tar' ou 'zip' pour une archive)
+    # stats = write_bundle(source_folder, os.path.join(destination_folder, "bundle.txt"), fmt='text')
+    # Magasin dédupliqué: un blob par contenu distinct, un manifeste par snapshot
+    # stats = store_snapshot(source_folder, os.path.join(destination_folder, "store"))
     
     print(f"Files have been copied and renamed in {destination_folder}")
+    print_report(stats)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,127 @@
+"""
+Tests of the copy engine on temporary folders.
+
+Usage: python -m pytest test_copy_and_rename_files.py
+"""
+import json
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+import copy_and_rename_files as copier
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(content)
+
+
+def test_same_output_name_is_written_once(tmp_path):
+    source, destination = tmp_path / 'src', tmp_path / 'dst'
+    destination.mkdir()
+    jobs = []
+    for folder in 'abcdef':
+        file_path = os.path.join(source, folder, 'util.py')
+        _write(file_path, folder.encode('utf-8') * 200000)
+        jobs.append((file_path, os.path.join(destination, copier.text_file_name('util.py'))))
+
+    unique, collisions = copier.unique_destinations(jobs)
+    assert unique == [jobs[-1]]
+    assert len(collisions) == len(jobs) - 1
+
+    stats = copier.copy_files(jobs, progress=False)
+    assert stats['files'] == 1 and stats['collisions'] == len(jobs) - 1
+    with open(os.path.join(destination, 'util_py.txt'), 'rb') as file:
+        assert file.read() == b'f' * 200000
+
+
+def test_sync_settles_with_output_name_collisions(tmp_path):
+    source, destination = tmp_path / 'src', tmp_path / 'dst'
+    destination.mkdir()
+    _write(os.path.join(source, 'a', 'util.py'), b'A\n')
+    _write(os.path.join(source, 'b', 'util.py'), b'B\n')
+    _write(os.path.join(source, 'main.py'), b'x = 1\n')
+
+    first = copier.sync_files(source, destination)
+    assert first['files'] == 2 and first['collisions'] == 1
+    second = copier.sync_files(source, destination)
+    assert second['files'] == 0 and second['skipped'] == 2 and second['collisions'] == 1
+
+    os.remove(os.path.join(source, 'main.py'))
+    third = copier.sync_files(source, destination, prune=True)
+    assert third['files'] == 0 and third['pruned'] == 1
+    assert sorted(os.listdir(destination)) == [copier.MANIFEST_NAME, 'util_py.txt']
+
+
+def test_snapshot_blobs_match_their_address(tmp_path):
+    source, store = tmp_path / 'src', tmp_path / 'store'
+    _write(os.path.join(source, 'latin1.h'), 'caf\xe9\n'.encode('latin-1'))
+    _write(os.path.join(source, 'lib', 'a.py'), b'same\n')
+    _write(os.path.join(source, 'lib', 'b.py'), b'same\n')
+
+    stats = copier.store_snapshot(source, store, 'first')
+    assert stats['unique'] == 2 and stats['deduplicated'] == 1
+    with open(os.path.join(store, copier.SNAPSHOTS_FOLDER, 'first.json'), encoding='utf-8') as file:
+        snapshot = json.load(file)
+    for relative_path, digest in snapshot['files'].items():
+        assert copier.file_hash(copier.blob_path(store, digest)) == digest
+
+    view = tmp_path / 'view'
+    assert copier.materialize_snapshot(store, 'first', view) == 3
+    with open(os.path.join(view, 'latin1_h.txt'), 'rb') as file:
+        assert file.read() == b'caf\n'
+
+
+def test_snapshot_leaves_out_files_whose_blob_failed(tmp_path, monkeypatch):
+    source, store = tmp_path / 'src', tmp_path / 'store'
+    _write(os.path.join(source, 'ok.py'), b'ok\n')
+    _write(os.path.join(source, 'broken.py'), b'broken\n')
+
+    copy_as_text = copier.copy_as_text
+
+    def failing_copy(file_path, new_file_path, *args):
+        if file_path.endswith('broken.py'):
+            raise OSError("disk full")
+        return copy_as_text(file_path, new_file_path, *args)
+
+    monkeypatch.setattr(copier, 'copy_as_text', failing_copy)
+    stats = copier.store_snapshot(source, store, 'partial')
+    assert stats['errors'] == 1 and stats['deduplicated'] == 0 and stats['dedup_rate'] == 0.0
+    with open(os.path.join(store, copier.SNAPSHOTS_FOLDER, 'partial.json'), encoding='utf-8') as file:
+        assert list(json.load(file)['files']) == ['ok.py']
+    assert copier.materialize_snapshot(store, 'partial', tmp_path / 'view') == 1
+
+
+@pytest.mark.parametrize('name, fmt, max_bytes', [
+    ('bundle.txt', 'text', 700), ('bundle.tar', 'tar', 12000), ('bundle.tar.gz', 'tar', 12000),
+    ('bundle.zip', 'zip', 1500)
+])
+def test_bundle_parts_stay_within_budget(tmp_path, name, fmt, max_bytes):
+    source, output = tmp_path / 'src', tmp_path / 'out'
+    output.mkdir()
+    for i in range(30):
+        _write(os.path.join(source, 'pkg' if i % 2 else 'lib', f'module_{i}.py'), b'x = 1\n' * (10 + 3 * i))
+
+    stats = copier.write_bundle(source, os.path.join(output, name), fmt=fmt, max_bytes=max_bytes)
+    parts = sorted(path for path in output.iterdir() if not path.name.endswith('.index.json'))
+    assert stats['files'] == 30 and len(parts) > 1
+    assert all(path.name.endswith(name.split('.', 1)[1]) for path in parts)
+    assert max(path.stat().st_size for path in parts) <= max_bytes
+
+    if fmt == 'text':
+        index = json.loads((output / (name + '.index.json')).read_text(encoding='utf-8'))
+        assert len(index) == 30
+    elif fmt == 'tar':
+        mode = 'r:gz' if name.endswith('.gz') else 'r:'
+        assert sum(len(tarfile.open(path, mode).getnames()) for path in parts) == 30
+    else:
+        assert sum(len(zipfile.ZipFile(path).namelist()) for path in parts) == 30
+
+
+def test_bundle_rejects_unknown_tar_compression(tmp_path):
+    _write(os.path.join(tmp_path, 'src', 'a.py'), b'a = 1\n')
+    with pytest.raises(ValueError):
+        copier.write_bundle(tmp_path / 'src', os.path.join(tmp_path, 'bundle.tar.zst'), fmt='tar')
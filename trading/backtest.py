@@ -0,0 +1,146 @@
+"""
+Backtest vectorisé des règles de signal produites par generate_signals.
+
+Chaque combinaison (ensemble de règles, seuil de vote) est une colonne d'une matrice
+temps x combinaisons: positions, rendements, drawdown et statistiques sont calculés
+par opérations sur tableaux, sans boucle sur les barres.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from technical_analisis import SIGNAL_INDICATORS
+
+
+def signal_matrix(df):
+    """
+    Extrait la matrice des codes de signal (temps x indicateurs, int8) et les clôtures.
+    """
+    codes = df[[f'Signal_{ind}' for ind in SIGNAL_INDICATORS]].to_numpy(dtype=np.int8)
+    return codes, df['Close'].to_numpy(dtype=np.float64)
+
+
+def rule_combinations(min_size=1, max_size=None, indicators=SIGNAL_INDICATORS):
+    """
+    Retourne les masques booléens (combinaisons x indicateurs) de tous les sous-ensembles de règles.
+    """
+    max_size = max_size or len(indicators)
+    masks = []
+    for size in range(min_size, max_size + 1):
+        for subset in itertools.combinations(range(len(indicators)), size):
+            mask = np.zeros(len(indicators), dtype=bool)
+            mask[list(subset)] = True
+            masks.append(mask)
+    return np.array(masks, dtype=bool).reshape(-1, len(indicators))
+
+
+def _positions(scores, thresholds, long_only):
+    """
+    Position par barre: +1 si le vote net atteint le seuil, -1 s'il atteint -seuil (sauf long_only), sinon 0.
+    """
+    long = scores >= thresholds
+    if long_only:
+        return long.astype(np.float64)
+    return long.astype(np.float64) - (scores <= -thresholds).astype(np.float64)
+
+
+def _metrics(positions, returns, cost, periods_per_year):
+    """
+    Statistiques de performance pour chaque colonne de positions (décidées à la clôture t,
+    appliquées au rendement t -> t+1).
+    """
+    held = np.vstack([np.zeros((1, positions.shape[1])), positions[:-1]])
+    changes = np.abs(np.diff(held, axis=0, prepend=0.0))
+    strategy = held * returns[:, None] - cost * changes
+
+    equity = np.cumprod(1.0 + strategy, axis=0)
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1.0
+
+    mean = strategy.mean(axis=0)
+    std = strategy.std(axis=0)
+    invested = held != 0
+    n_invested = invested.sum(axis=0)
+    wins = ((strategy > 0) & invested).sum(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+        hit_rate = np.where(n_invested > 0, wins / n_invested, np.nan)
+
+    return {
+        'Rendement': equity[-1] - 1.0,
+        'Sharpe': sharpe,
+        'Drawdown max': drawdown.min(axis=0),
+        'Taux de réussite': hit_rate,
+        'Rotation': changes.sum(axis=0) / len(strategy),
+        'Transactions': (changes > 0).sum(axis=0),
+        'Exposition': n_invested / len(strategy)
+    }
+
+
+def backtest_grid(codes, close, masks=None, thresholds=(1, 2, 3), cost=0.0, long_only=False,
+                  periods_per_year=252):
+    """
+    Évalue toutes les combinaisons (masque de règles x seuil de vote) en une passe.
+    codes: matrice temps x indicateurs (-1/0/+1), close: clôtures alignées,
+    cost: coût de transaction par unité de position échangée (0.001 = 10 pb).
+    Retourne un DataFrame d'une ligne par combinaison, trié par Sharpe décroissant.
+    """
+    masks = rule_combinations() if masks is None else np.asarray(masks, dtype=bool)
+    codes = np.asarray(codes, dtype=np.int8)
+    close = np.asarray(close, dtype=np.float64)
+
+    returns = np.zeros(len(close))
+    returns[1:] = close[1:] / close[:-1] - 1.0
+    returns = np.nan_to_num(returns)
+
+    # Votes nets de chaque ensemble de règles: (temps x indicateurs) @ (indicateurs x masques)
+    scores = codes.astype(np.int16) @ masks.T.astype(np.int16)
+
+    # Une colonne par couple (masque, seuil); les seuils supérieurs au nombre de règles sont inutiles
+    mask_ids, threshold_values = [], []
+    for j, mask in enumerate(masks):
+        for threshold in thresholds:
+            if threshold <= mask.sum():
+                mask_ids.append(j)
+                threshold_values.append(threshold)
+    mask_ids = np.array(mask_ids, dtype=np.int64)
+    threshold_values = np.array(threshold_values, dtype=np.int16)
+
+    positions = _positions(scores[:, mask_ids], threshold_values, long_only)
+    metrics = _metrics(positions, returns, cost, periods_per_year)
+
+    results = pd.DataFrame({
+        'Règles': ['+'.join(np.array(SIGNAL_INDICATORS)[masks[j]]) for j in mask_ids],
+        'Seuil': threshold_values,
+        **metrics
+    })
+    return results.sort_values('Sharpe', ascending=False, ignore_index=True)
+
+
+def backtest(df, rules=SIGNAL_INDICATORS, threshold=1, cost=0.0, long_only=False, periods_per_year=252):
+    """
+    Backtest d'une seule combinaison de règles sur un DataFrame issu de generate_signals.
+    Retourne un dict de statistiques.
+    """
+    codes, close = signal_matrix(df)
+    mask = np.array([[ind in rules for ind in SIGNAL_INDICATORS]])
+    results = backtest_grid(codes, close, mask, (threshold,), cost, long_only, periods_per_year)
+    if results.empty:
+        raise ValueError(f"Seuil {threshold} supérieur au nombre de règles ({len(rules)})")
+    return results.iloc[0].to_dict()
+
+
+def backtest_universe(frames, masks=None, thresholds=(1, 2, 3), cost=0.0, long_only=False, periods_per_year=252):
+    """
+    Applique backtest_grid à chaque ticker d'un dict {ticker: DataFrame avec signaux}.
+    Retourne un DataFrame (ticker, combinaison).
+    """
+    masks = rule_combinations() if masks is None else masks
+    results = []
+    for ticker, df in frames.items():
+        codes, close = signal_matrix(df)
+        grid = backtest_grid(codes, close, masks, thresholds, cost, long_only, periods_per_year)
+        grid.insert(0, 'Ticker', ticker)
+        results.append(grid)
+    return pd.concat(results, ignore_index=True)
@@ -0,0 +1,161 @@
+"""
+Benchmarks hors ligne de l'analyse technique sur des données OHLCV synthétiques.
+
+Usage: python benchmarks.py
+"""
+import contextlib
+import io
+import math
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from data_sources import REFERENCE_SYMBOLS, FrameDataSource
+from technical_analisis import (
+    calculate_indicators, create_visualization, generate_signals, prepare_data, print_summary
+)
+
+
+def synthetic_ohlcv(n_bars, seed=0, start='2000-01-03', freq='min'):
+    """
+    Génère une série OHLCV aléatoire (marche géométrique) avec les colonnes de référence
+    VIX, SP500, NASDAQ et DOW attendues par calculate_indicators.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n_bars, freq=freq)
+
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    spread = rng.uniform(0, 0.01, (2, n_bars))
+    df = pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.002, n_bars)),
+        'High': close * (1 + spread[0]),
+        'Low': close * (1 - spread[1]),
+        'Close': close,
+        'Volume': rng.integers(1_000, 1_000_000, n_bars).astype(np.float64)
+    }, index=index)
+
+    market = np.exp(np.cumsum(rng.normal(0, 0.005, (3, n_bars)), axis=1))
+    df['VIX'] = 20 + rng.normal(0, 2, n_bars)
+    df['SP500'] = market[0] / market[0, 0]
+    df['NASDAQ'] = market[1] / market[1, 0]
+    df['DOW'] = market[2] / market[2, 0]
+    return df
+
+
+def synthetic_universe(n_tickers, n_bars, freq='min', seed=0):
+    """
+    Génère un univers de tickers synthétiques et les indices de référence, se terminant maintenant.
+    Retourne (FrameDataSource, liste des tickers, nombre de jours à demander à prepare_data).
+    """
+    end = pd.Timestamp.now().floor(freq)
+    start = end - pd.Timedelta(1, unit=freq) * (n_bars - 1)
+    columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+    frames = {}
+    tickers = [f"SYN{i:04d}" for i in range(n_tickers)]
+    for i, ticker in enumerate(tickers):
+        frames[ticker] = synthetic_ohlcv(n_bars, seed=seed + i, start=start, freq=freq)[columns]
+
+    market = synthetic_ohlcv(n_bars, seed=seed + n_tickers, start=start, freq=freq)
+    for column, symbol in REFERENCE_SYMBOLS.items():
+        frames[symbol] = pd.DataFrame({'Close': market[column]})
+
+    days = math.ceil((end - start) / pd.Timedelta(days=1)) + 1
+    return FrameDataSource(frames), tickers, days
+
+
+def _measure(func):
+    """
+    Exécute func deux fois: une fois pour le temps, une fois sous tracemalloc pour
+    le pic mémoire et le nombre de blocs retenus (alloués pendant l'appel et toujours vivants
+    à la fin, pas le nombre total d'allocations). Retourne (résultat, mesures).
+    """
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    return result, {'Secondes': seconds, 'Pic mémoire (Mo)': peak / 1024 ** 2, 'Blocs retenus': retained}
+
+
+def _visualize(df, ticker):
+    create_visualization(df, ticker, show=False)
+    return df
+
+
+def _summarize(df):
+    print_summary(df)
+    return df
+
+
+def benchmark_pipeline(n_bars=10_000, n_tickers=1, freq='min', backend='ta'):
+    """
+    Mesure chaque étape de run_analysis (sans réseau ni navigateur) sur des données synthétiques.
+    Retourne un DataFrame indexé par (ticker, étape).
+    """
+    source, tickers, days = synthetic_universe(n_tickers, n_bars, freq=freq)
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for ticker in tickers:
+            df, stats = _measure(lambda: prepare_data(ticker, days, source=source))
+            results.append({'Ticker': ticker, 'Étape': 'prepare_data', 'Barres': len(df), **stats})
+
+            stages = [
+                ('calculate_indicators', lambda frame: calculate_indicators(frame.copy(), backend=backend)),
+                ('generate_signals', lambda frame: generate_signals(frame.copy())),
+                ('create_visualization', lambda frame: _visualize(frame, ticker)),
+                ('print_summary', _summarize)
+            ]
+            for name, stage in stages:
+                df, stats = _measure(lambda: stage(df))
+                results.append({'Ticker': ticker, 'Étape': name, 'Barres': len(df), **stats})
+
+    return pd.DataFrame(results).set_index(['Ticker', 'Étape'])
+
+
+def _best_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark_backends(sizes=(1_000, 100_000, 10_000_000), backends=('ta', 'numpy'), repeat=3):
+    """
+    Mesure calculate_indicators pour chaque backend et taille de série.
+    Retourne un DataFrame (taille x backend) des meilleurs temps en secondes.
+    """
+    results = []
+    for n_bars in sizes:
+        df = synthetic_ohlcv(n_bars)
+        # Les grandes tailles ne sont mesurées qu'une fois (le backend ta dépasse la minute à 10M)
+        runs = repeat if n_bars <= 100_000 else 1
+        for backend in backends:
+            with contextlib.redirect_stdout(io.StringIO()):
+                # Un premier appel hors mesure compile les noyaux Numba le cas échéant
+                calculate_indicators(df.iloc[:1_000].copy(), backend=backend)
+                seconds = _best_time(lambda: calculate_indicators(df.copy(), backend=backend), runs)
+            results.append({'Barres': n_bars, 'Backend': backend, 'Secondes': seconds})
+            print(f"{n_bars:>12,} barres  {backend:<6} {seconds:10.4f} s")
+
+    table = pd.DataFrame(results).pivot(index='Barres', columns='Backend', values='Secondes')
+    if 'ta' in table.columns and 'numpy' in table.columns:
+        table['Accélération'] = table['ta'] / table['numpy']
+    return table
+
+
+if __name__ == "__main__":
+    print(benchmark_pipeline(n_bars=10_000, n_tickers=3).to_string())
+    print(benchmark_backends().to_string())
@@ -0,0 +1,276 @@
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pandas as pd
+import yfinance as yf
+
+from instrumentation import get_logger
+
+logger = get_logger('data_sources')
+
+# Indices de référence utilisés par l'analyse (colonne -> symbole Yahoo)
+REFERENCE_SYMBOLS = {
+    'VIX': '^VIX',
+    'SP500': '^GSPC',
+    'NASDAQ': '^IXIC',
+    'DOW': '^DJI'
+}
+
+
+def _flatten_columns(df):
+    """
+    Supprime le multi-index des colonnes si présent.
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    return df
+
+
+class YahooDataSource:
+    """
+    Source de données yfinance: un seul téléchargement groupé pour plusieurs symboles.
+    """
+
+    def download(self, symbols, start, end):
+        """
+        Télécharge les barres OHLCV et retourne un dict {symbole: DataFrame}.
+        Les symboles sans données sont associés à un DataFrame vide.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        data = yf.download(symbols, start=start, end=end, group_by='ticker', progress=False)
+
+        frames = {}
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex) and symbol in data.columns.get_level_values(0):
+                df = data[symbol]
+            elif not isinstance(data.columns, pd.MultiIndex) and len(symbols) == 1:
+                df = data
+            else:
+                df = pd.DataFrame()
+            frames[symbol] = _flatten_columns(df).dropna(how='all')
+        return frames
+
+
+def yahoo_fetch(symbol, start, end, timeout, session=None):
+    """
+    Télécharge les barres d'un seul symbole via yfinance.
+    session=None laisse yfinance réutiliser sa session HTTP partagée.
+    """
+    df = yf.download(symbol, start=start, end=end, progress=False, threads=False,
+                     timeout=timeout, session=session, multi_level_index=False)
+    return _flatten_columns(df).dropna(how='all')
+
+
+class ConcurrentDataSource:
+    """
+    Source de données qui télécharge chaque symbole dans un pool de threads borné,
+    avec délai d'expiration par requête et nouvelles tentatives à délai exponentiel.
+    `fetch(symbol, start, end, timeout)` peut être remplacé par un stub local pour les tests.
+    """
+
+    def __init__(self, fetch=None, max_workers=5, timeout=10, retries=3, backoff=0.5, session=None):
+        self.fetch = fetch
+        self.session = session
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+    def _fetch(self, symbol, start, end):
+        if self.fetch is not None:
+            return self.fetch(symbol, start, end, self.timeout)
+        return yahoo_fetch(symbol, start, end, self.timeout, session=self.session)
+
+    def _fetch_with_retry(self, symbol, start, end):
+        """
+        Télécharge un symbole; une erreur ou un résultat vide déclenche une nouvelle tentative.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                df = self._fetch(symbol, start, end)
+                if df is not None and not df.empty:
+                    return df
+                logger.debug("Aucune donnée pour %s (tentative %d)", symbol, attempt + 1)
+            except Exception as e:
+                logger.debug("Échec du téléchargement de %s (tentative %d): %s", symbol, attempt + 1, e)
+            if attempt < self.retries:
+                time.sleep(self.backoff * 2 ** attempt)
+        logger.warning("Abandon du téléchargement de %s après %d tentatives", symbol, self.retries + 1)
+        return pd.DataFrame()
+
+    def download(self, symbols, start, end):
+        """
+        Télécharge les symboles en parallèle et retourne un dict {symbole: DataFrame}.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(symbols)) or 1) as executor:
+            futures = {symbol: executor.submit(self._fetch_with_retry, symbol, start, end) for symbol in symbols}
+            return {symbol: future.result() for symbol, future in futures.items()}
+
+
+class FrameDataSource:
+    """
+    Source de données hors ligne à partir de DataFrames déjà chargés (tests, rejeu).
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def download(self, symbols, start, end):
+        """
+        Retourne les barres de chaque symbole comprises entre start et end.
+        """
+        frames = {}
+        for symbol in dict.fromkeys(symbols):
+            df = self.frames.get(symbol)
+            if df is None:
+                frames[symbol] = pd.DataFrame()
+            else:
+                df = _flatten_columns(df)
+                frames[symbol] = df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+        return frames
+
+
+class CachedDataSource:
+    """
+    Cache disque local des barres OHLCV (un fichier Parquet par symbole).
+    Seules les barres manquantes (début ou fin de fenêtre) sont téléchargées;
+    la fin n'est rafraîchie que si le cache est plus vieux que max_age.
+    Les fichiers les moins récemment utilisés sont supprimés au-delà de max_bytes.
+    """
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, source=None, cache_dir=None, max_bytes=500 * 1024 ** 2, max_age=timedelta(hours=12)):
+        self.source = source or YahooDataSource()
+        self.cache_dir = os.path.expanduser(cache_dir or os.path.join('~', '.cache', 'technical_analisis'))
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_index(self):
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _path(self, symbol):
+        return os.path.join(self.cache_dir, re.sub(r'[^A-Za-z0-9._-]', '_', symbol) + '.parquet')
+
+    def _read(self, symbol):
+        path = self._path(symbol)
+        if symbol not in self._index or not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_parquet(path)
+
+    def _write(self, symbol, df, start, end):
+        df.to_parquet(self._path(symbol))
+        entry = self._index.get(symbol, {})
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        entry['start'] = min(start, pd.Timestamp(entry.get('start', start))).isoformat()
+        entry['end'] = max(end, pd.Timestamp(entry.get('end', end))).isoformat()
+        entry['fetched_at'] = time.time()
+        self._index[symbol] = entry
+
+    def _missing_ranges(self, symbol, cached, start, end):
+        """
+        Retourne les fenêtres à télécharger pour compléter le cache d'un symbole.
+        """
+        entry = self._index.get(symbol)
+        if entry is None or cached.empty:
+            return [(start, end)]
+
+        ranges = []
+        covered_start = pd.Timestamp(entry['start'])
+        if pd.Timestamp(start) < covered_start:
+            ranges.append((start, covered_start.to_pydatetime()))
+
+        is_stale = time.time() - entry['fetched_at'] > self.max_age.total_seconds()
+        if pd.Timestamp(end) > pd.Timestamp(entry['end']) and is_stale:
+            # La dernière barre en cache peut être incomplète: on la retélécharge
+            ranges.append((cached.index[-1].to_pydatetime(), end))
+        return ranges
+
+    def download(self, symbols, start, end):
+        """
+        Retourne un dict {symbole: DataFrame} en ne téléchargeant que les barres absentes du cache.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        cached = {symbol: self._read(symbol) for symbol in symbols}
+
+        # Regrouper les symboles ayant la même fenêtre manquante pour un seul appel groupé
+        requests = {}
+        for symbol in symbols:
+            for window in self._missing_ranges(symbol, cached[symbol], start, end):
+                requests.setdefault(window, []).append(symbol)
+
+        for (fetch_start, fetch_end), group in requests.items():
+            logger.debug("Cache: téléchargement de %s du %s au %s", group, fetch_start, fetch_end)
+            fetched = self.source.download(group, fetch_start, fetch_end)
+            for symbol in group:
+                new = fetched.get(symbol, pd.DataFrame())
+                merged = pd.concat([cached[symbol], new]) if not cached[symbol].empty else new
+                merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+                cached[symbol] = merged
+                self._write(symbol, merged, fetch_start, fetch_end)
+
+        now = time.time()
+        for symbol in symbols:
+            if symbol in self._index:
+                self._index[symbol]['accessed_at'] = now
+        self._evict()
+        self._save_index()
+
+        frames = {}
+        for symbol in symbols:
+            df = cached[symbol]
+            if not df.empty:
+                df = df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+            frames[symbol] = df
+        return frames
+
+    def _evict(self):
+        """
+        Supprime les symboles les moins récemment utilisés jusqu'à respecter max_bytes.
+        """
+        sizes = {}
+        for symbol in self._index:
+            path = self._path(symbol)
+            sizes[symbol] = os.path.getsize(path) if os.path.exists(path) else 0
+
+        total = sum(sizes.values())
+        by_access = sorted(self._index, key=lambda s: self._index[s].get('accessed_at', 0))
+        for symbol in by_access:
+            if total <= self.max_bytes:
+                break
+            path = self._path(symbol)
+            if os.path.exists(path):
+                os.remove(path)
+            logger.debug("Cache: éviction de %s", symbol)
+            total -= sizes[symbol]
+            del self._index[symbol]
+
+    def clear(self):
+        """
+        Vide entièrement le cache.
+        """
+        for symbol in list(self._index):
+            path = self._path(symbol)
+            if os.path.exists(path):
+                os.remove(path)
+        self._index = {}
+        self._save_index()
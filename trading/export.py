@@ -0,0 +1,177 @@
+"""
+Export colonnaire des indicateurs et des codes de signal (Parquet partitionné ou Arrow IPC)
+pour que les traitements en aval n'aient pas à relancer l'analyse.
+
+Parquet: <racine>/ticker=<TICKER encodé URI>/year=<AAAA>/part-*.parquet
+Arrow IPC: <racine>/<TICKER>.arrow (lu par memory mapping)
+"""
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from technical_analisis import INDICATOR_COLUMNS, SIGNAL_INDICATORS
+
+EXPORT_COLUMNS = ['Close'] + INDICATOR_COLUMNS + [f'Signal_{ind}' for ind in SIGNAL_INDICATORS] + ['Signal_Score']
+
+# Types explicites: un ticker numérique (ex. 7203) reste une chaîne. pyarrow encode les valeurs
+# dans les noms de dossiers (^GSPC -> ticker=%5EGSPC): on passe toujours par le dataset, jamais par un chemin
+PARTITIONING = ds.partitioning(pa.schema([('ticker', pa.string()), ('year', pa.int32())]), flavor='hive')
+
+
+def _to_table(df, ticker):
+    """
+    Convertit un DataFrame analysé en table Arrow (colonne Date, colonnes exportées, ticker, year).
+    """
+    columns = [col for col in EXPORT_COLUMNS if col in df.columns]
+    frame = df[columns].copy()
+    frame.index = pd.DatetimeIndex(frame.index).tz_localize(None) if frame.index.tz is not None else frame.index
+    frame.insert(0, 'Date', frame.index)
+    frame['ticker'] = ticker
+    frame['year'] = frame['Date'].dt.year.astype(np.int32)
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+def _ipc_path(root, ticker):
+    return os.path.join(root, re.sub(r'[^A-Za-z0-9._-]', '_', ticker) + '.arrow')
+
+
+def _read_ipc(path):
+    with pa.memory_map(path, 'r') as source:
+        return ipc.open_file(source).read_all()
+
+
+def _ticker_fragments(root, ticker):
+    """
+    Fichiers Parquet déjà exportés pour un ticker (liste vide si aucun).
+    """
+    if not os.path.isdir(root):
+        return []
+    dataset = ds.dataset(root, format='parquet', partitioning=PARTITIONING)
+    return list(dataset.get_fragments(filter=ds.field('ticker') == ticker))
+
+
+def _last_exported_date(root, ticker, fmt):
+    """
+    Dernière date déjà exportée pour un ticker (None si aucune).
+    """
+    if fmt == 'ipc':
+        path = _ipc_path(root, ticker)
+        if not os.path.exists(path):
+            return None
+        dates = _read_ipc(path).column('Date')
+    else:
+        fragments = _ticker_fragments(root, ticker)
+        if not fragments:
+            return None
+        dates = pa.concat_tables(fragment.to_table(columns=['Date']) for fragment in fragments).column('Date')
+    if len(dates) == 0:
+        return None
+    return pd.Timestamp(pc.max(dates).as_py())
+
+
+def _remove_empty_folders(root):
+    for folder, _, _ in sorted(os.walk(root), key=lambda entry: -len(entry[0])):
+        if folder != root and not os.listdir(folder):
+            os.rmdir(folder)
+
+
+def export_indicators(frames, root, fmt='parquet', append=True):
+    """
+    Écrit les indicateurs et codes de signal d'un dict {ticker: DataFrame analysé}.
+    En mode append, seules les barres postérieures à la dernière date exportée sont ajoutées
+    (incréments quotidiens idempotents); sinon les données du ticker sont remplacées.
+    Retourne le nombre de lignes écrites par ticker.
+    """
+    if fmt not in ('parquet', 'ipc'):
+        raise ValueError(f"Format inconnu: {fmt}")
+    os.makedirs(root, exist_ok=True)
+
+    written = {}
+    for ticker, df in frames.items():
+        table = _to_table(df, ticker)
+        last_date = _last_exported_date(root, ticker, fmt) if append else None
+        if last_date is not None:
+            table = table.filter(pc.greater(table.column('Date'), pa.scalar(last_date, type=table.schema.field('Date').type)))
+        written[ticker] = table.num_rows
+
+        if fmt == 'ipc':
+            path = _ipc_path(root, ticker)
+            if last_date is not None:
+                existing = _read_ipc(path)
+                table = pa.concat_tables([existing, table.cast(existing.schema)])
+            tmp_path = path + '.tmp'
+            with pa.OSFile(tmp_path, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_path, path)
+            continue
+
+        # Remplacement: toutes les partitions year= du ticker sont supprimées, pas seulement celles réécrites
+        if not append:
+            for fragment in _ticker_fragments(root, ticker):
+                os.remove(fragment.path)
+            _remove_empty_folders(root)
+        if table.num_rows == 0:
+            continue
+        ds.write_dataset(
+            table, root, format='parquet', partitioning=PARTITIONING,
+            basename_template=f"part-{time.time_ns()}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore'
+        )
+    return written
+
+
+def read_indicators(root, tickers=None, columns=None, start=None, end=None, fmt='parquet'):
+    """
+    Relit les données exportées en ne chargeant que les colonnes et la période demandées
+    (fichiers ouverts par memory mapping). Retourne un DataFrame indexé par (ticker, Date).
+    """
+    columns = list(columns) if columns is not None else None
+    wanted = None if columns is None else list(dict.fromkeys(['Date', 'ticker'] + columns))
+
+    if fmt == 'ipc':
+        names = tickers if tickers is not None else [
+            name[:-len('.arrow')] for name in sorted(os.listdir(root)) if name.endswith('.arrow')
+        ]
+        tables = []
+        for ticker in names:
+            path = _ipc_path(root, ticker)
+            if os.path.exists(path):
+                table = _read_ipc(path)
+                tables.append(table.select(wanted) if wanted else table)
+        if not tables:
+            return pd.DataFrame()
+        table = pa.concat_tables(tables)
+        mask = None
+        if start is not None:
+            mask = pc.greater_equal(table.column('Date'), pa.scalar(pd.Timestamp(start), type=table.schema.field('Date').type))
+        if end is not None:
+            upper = pc.less_equal(table.column('Date'), pa.scalar(pd.Timestamp(end), type=table.schema.field('Date').type))
+            mask = upper if mask is None else pc.and_(mask, upper)
+        if mask is not None:
+            table = table.filter(mask)
+    else:
+        filters = []
+        if tickers is not None:
+            filters.append(('ticker', 'in', [str(ticker) for ticker in tickers]))
+        if start is not None:
+            filters.append(('Date', '>=', pd.Timestamp(start)))
+            filters.append(('year', '>=', pd.Timestamp(start).year))
+        if end is not None:
+            filters.append(('Date', '<=', pd.Timestamp(end)))
+            filters.append(('year', '<=', pd.Timestamp(end).year))
+        table = pq.read_table(root, columns=wanted, filters=filters or None, memory_map=True,
+                              partitioning=PARTITIONING)
+
+    df = table.to_pandas()
+    if 'year' in df.columns and (columns is None or 'year' not in columns):
+        df = df.drop(columns='year')
+    df['ticker'] = df['ticker'].astype(str)
+    return df.set_index(['ticker', 'Date']).sort_index()
@@ -0,0 +1,289 @@
+"""
+Noyaux NumPy des indicateurs techniques, alternative au backend `ta`.
+
+Chaque fonction travaille sur des tableaux float64 contigus, 1-D (une série) ou 2-D
+(temps x tickers, calcul colonne par colonne). Les résultats reproduisent ceux de `ta`
+(mêmes périodes de chauffe NaN, même traitement des valeurs manquantes); les moyennes et écarts-types glissants passent par des
+sommes cumulées et restent à environ 1e-8 en relatif du calcul pandas.
+
+Les boucles récursives (EMA, lissage de Wilder, ATR) sont compilées par Numba si celui-ci
+est installé, sinon exécutées en Python pur sur des listes.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    numba = None
+    HAS_NUMBA = False
+
+
+def _maybe_jit(func):
+    """
+    Compile la fonction avec Numba si disponible.
+    """
+    return numba.njit(cache=True)(func) if HAS_NUMBA else func
+
+
+def _as_float_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _ewm_loop(values, alpha, min_periods, out):
+    """
+    EMA adjust=False démarrant à la première valeur valide, comme pandas ewm(ignore_na=False):
+    la valeur précédente est reportée sur les NaN et son poids continue de décroître,
+    si bien que la valeur suivante pèse davantage après un trou.
+    """
+    current = 0.0
+    weight = 1.0
+    count = 0
+    for i in range(len(values)):
+        value = values[i]
+        if count > 0:
+            weight *= 1.0 - alpha
+        if value == value:
+            if count == 0:
+                current = value
+            else:
+                current = (weight * current + alpha * value) / (weight + alpha)
+            weight = 1.0
+            count += 1
+        out[i] = current if count >= min_periods else np.nan
+    return out
+
+
+def _atr_loop(true_range, window, out):
+    """
+    ATR de `ta`: 0 avant la fenêtre, moyenne des premiers true ranges valides puis lissage de Wilder
+    (un true range NaN se propage ensuite, comme dans `ta`).
+    """
+    n = len(true_range)
+    seed = 0.0
+    valid = 0
+    for i in range(n):
+        if i < window:
+            if true_range[i] == true_range[i]:
+                seed += true_range[i]
+                valid += 1
+            if i < window - 1:
+                out[i] = 0.0
+            else:
+                out[i] = seed / valid if valid > 0 else np.nan
+        else:
+            out[i] = (out[i - 1] * (window - 1) + true_range[i]) / window
+    return out
+
+
+_ewm_loop_jit = _maybe_jit(_ewm_loop)
+_atr_loop_jit = _maybe_jit(_atr_loop)
+
+
+def _apply_columns(loop, jitted, values, *args):
+    """
+    Applique une boucle récursive à chaque colonne (ou à la série 1-D).
+    """
+    values = _as_float_array(values)
+    columns = values.reshape(len(values), -1)
+    out = np.empty_like(columns)
+    for j in range(columns.shape[1]):
+        if HAS_NUMBA:
+            jitted(np.ascontiguousarray(columns[:, j]), *args, out[:, j])
+        else:
+            column_out = [0.0] * len(columns)
+            loop(columns[:, j].tolist(), *args, column_out)
+            out[:, j] = column_out
+    return out.reshape(values.shape)
+
+
+def _nan_head(values, count):
+    """
+    Tableau rempli de NaN pour les `count` premières lignes.
+    """
+    return np.full((min(count, len(values)),) + values.shape[1:], np.nan)
+
+
+def _column_offset(values):
+    """
+    Moyenne de chaque colonne en ignorant les NaN (0 pour une colonne vide).
+    """
+    valid = ~np.isnan(values)
+    return np.where(valid, values, 0.0).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+
+
+def rolling_mean(values, window):
+    """
+    Moyenne glissante (NaN tant que la fenêtre n'est pas pleine).
+    """
+    values = _as_float_array(values)
+    if len(values) < window:
+        return np.full(values.shape, np.nan)
+    # Centrer avant de cumuler limite la perte de précision sur les longues séries
+    missing = np.isnan(values)
+    offset = _column_offset(values)
+    cumsum = np.cumsum(np.where(missing, 0.0, values - offset), axis=0)
+    cumsum = np.concatenate([np.zeros((1,) + values.shape[1:]), cumsum])
+    means = (cumsum[window:] - cumsum[:-window]) / window + offset
+
+    # Comme pandas (min_periods=window): NaN dès qu'une valeur manque dans la fenêtre
+    missing_count = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(missing, axis=0)])
+    means[(missing_count[window:] - missing_count[:-window]) > 0] = np.nan
+    return np.concatenate([_nan_head(values, window - 1), means])
+
+
+def rolling_std(values, window):
+    """
+    Écart-type glissant (ddof=0) comme pandas.rolling(...).std(ddof=0).
+    """
+    values = _as_float_array(values)
+    if len(values) < window:
+        return np.full(values.shape, np.nan)
+    centered = values - _column_offset(values)
+    mean = rolling_mean(centered, window)
+    mean_sq = rolling_mean(centered * centered, window)
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def rolling_min(values, window):
+    """
+    Minimum glissant (NaN tant que la fenêtre n'est pas pleine).
+    """
+    values = _as_float_array(values)
+    if len(values) < window:
+        return np.full(values.shape, np.nan)
+    windows = sliding_window_view(values, window, axis=0)
+    return np.concatenate([_nan_head(values, window - 1), windows.min(axis=-1)])
+
+
+def rolling_max(values, window):
+    """
+    Maximum glissant (NaN tant que la fenêtre n'est pas pleine).
+    """
+    values = _as_float_array(values)
+    if len(values) < window:
+        return np.full(values.shape, np.nan)
+    windows = sliding_window_view(values, window, axis=0)
+    return np.concatenate([_nan_head(values, window - 1), windows.max(axis=-1)])
+
+
+def ema(values, span=None, alpha=None, min_periods=None):
+    """
+    Moyenne mobile exponentielle (adjust=False), définie par span ou alpha.
+    """
+    if alpha is None:
+        alpha = 2.0 / (span + 1.0)
+    if min_periods is None:
+        min_periods = span if span is not None else 0
+    return _apply_columns(_ewm_loop, _ewm_loop_jit, values, float(alpha), int(min_periods))
+
+
+def macd(close, window_slow=26, window_fast=12, window_sign=9):
+    """
+    Retourne (macd, signal) comme ta.trend.MACD.
+    """
+    line = ema(close, span=window_fast) - ema(close, span=window_slow)
+    return line, ema(line, span=window_sign)
+
+
+def rsi(values, window=14):
+    """
+    RSI de Wilder comme ta.momentum.rsi (les variations NaN comptent comme 0).
+    """
+    values = _as_float_array(values)
+    diff = np.diff(values, axis=0, prepend=np.nan)
+    diff = np.where(np.isnan(diff), 0.0, diff)
+    up = ema(np.maximum(diff, 0.0), alpha=1.0 / window, min_periods=window)
+    down = ema(np.maximum(-diff, 0.0), alpha=1.0 / window, min_periods=window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(down == 0, 100.0, 100.0 - 100.0 / (1.0 + up / down))
+    return np.where(np.isnan(down), np.nan, result)
+
+
+def true_range(high, low, close):
+    """
+    True range: max(high - low, |high - close précédent|, |low - close précédent|).
+    """
+    high, low, close = _as_float_array(high), _as_float_array(low), _as_float_array(close)
+    previous = np.concatenate([_nan_head(close, 1), close[:-1]])
+    # fmax ignore les NaN: NaN seulement si les trois écarts manquent
+    return np.fmax(np.fmax(high - low, np.abs(high - previous)), np.abs(low - previous))
+
+
+def atr(high, low, close, window=14):
+    """
+    Average True Range comme ta.volatility.average_true_range.
+    """
+    ranges = true_range(high, low, close)
+    if len(ranges) < window:
+        return np.zeros(ranges.shape)
+    return _apply_columns(_atr_loop, _atr_loop_jit, ranges, int(window))
+
+
+def bollinger(close, window=20, window_dev=2):
+    """
+    Retourne (haute, moyenne, basse) comme ta.volatility.BollingerBands.
+    """
+    middle = rolling_mean(close, window)
+    deviation = rolling_std(close, window)
+    return middle + window_dev * deviation, middle, middle - window_dev * deviation
+
+
+def stochastic(high, low, close, window=14, smooth_window=3):
+    """
+    Retourne (%K, %D) comme ta.momentum.StochasticOscillator.
+    """
+    lowest = rolling_min(low, window)
+    highest = rolling_max(high, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stoch_k = 100 * (_as_float_array(close) - lowest) / (highest - lowest)
+    return stoch_k, rolling_mean(stoch_k, smooth_window)
+
+
+def roc(close, window=12):
+    """
+    Rate of change en pourcentage comme ta.momentum.roc.
+    """
+    close = _as_float_array(close)
+    shifted = np.concatenate([_nan_head(close, window), close[:-window]])[:len(close)]
+    return (close - shifted) / shifted * 100
+
+
+def vwap(close, volume):
+    """
+    VWAP cumulé depuis le début de la série. Comme pandas cumsum, une barre manquante
+    donne NaN sur sa ligne sans interrompre le cumul des suivantes.
+    """
+    close, volume = _as_float_array(close), _as_float_array(volume)
+    traded = close * volume
+    numerator = np.where(np.isnan(traded), np.nan, np.nancumsum(traded, axis=0))
+    denominator = np.where(np.isnan(volume), np.nan, np.nancumsum(volume, axis=0))
+    return numerator / denominator
+
+
+def pct_change(values):
+    """
+    Variation relative d'une ligne à la suivante (NaN sur la première ligne).
+    """
+    values = _as_float_array(values)
+    previous = np.concatenate([_nan_head(values, 1), values[:-1]])
+    return values / previous - 1
+
+
+def compute_indicators(close, high, low, volume, sp500):
+    """
+    Calcule l'ensemble des colonnes de calculate_indicators et retourne un dict de tableaux.
+    """
+    indicators = {}
+    indicators['SMA20'] = rolling_mean(close, 20)
+    indicators['SMA50'] = rolling_mean(close, 50)
+    indicators['MACD'], indicators['MACD_Signal'] = macd(close)
+    indicators['RSI'] = rsi(close)
+    indicators['BB_Upper'], indicators['BB_Middle'], indicators['BB_Lower'] = bollinger(close)
+    indicators['ATR'] = atr(high, low, close)
+    indicators['Stoch_K'], indicators['Stoch_D'] = stochastic(high, low, close)
+    indicators['Momentum'] = roc(close)
+    indicators['VWAP'] = vwap(close, volume)
+    indicators['CRSI'] = rsi(pct_change(close) - pct_change(sp500))
+    return indicators
@@ -0,0 +1,307 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from technical_analisis import SIGNAL_INDICATORS, compute_signal_codes
+
+
+class _RollingMean:
+    """
+    Moyenne et écart-type (ddof=0) glissants par sommes cumulées, NaN tant que la fenêtre n'est pas pleine
+    ou qu'elle contient une valeur manquante (comme pandas rolling avec min_periods=window).
+    """
+
+    RESYNC_EVERY = 10000
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.missing = 0
+        self.updates = 0
+
+    def _add(self, value, sign):
+        if math.isnan(value):
+            self.missing += sign
+        else:
+            self.total += sign * value
+            self.total_sq += sign * value * value
+
+    def update(self, value):
+        self.values.append(value)
+        self._add(value, 1)
+        if len(self.values) > self.window:
+            self._add(self.values.popleft(), -1)
+
+        # Resynchronisation périodique pour éviter la dérive numérique des sommes
+        self.updates += 1
+        if self.updates % self.RESYNC_EVERY == 0:
+            self.total = math.fsum(v for v in self.values if not math.isnan(v))
+            self.total_sq = math.fsum(v * v for v in self.values if not math.isnan(v))
+
+    @property
+    def ready(self):
+        return len(self.values) == self.window and self.missing == 0
+
+    def mean(self):
+        return self.total / self.window if self.ready else math.nan
+
+    def std(self):
+        if not self.ready:
+            return math.nan
+        mean = self.total / self.window
+        return math.sqrt(max(self.total_sq / self.window - mean * mean, 0.0))
+
+
+class _RollingExtremum:
+    """
+    Minimum ou maximum glissant par file monotone (O(1) amorti),
+    NaN tant qu'une valeur manquante reste dans la fenêtre.
+    """
+
+    def __init__(self, window, use_max):
+        self.window = window
+        self.use_max = use_max
+        self.queue = deque()
+        self.count = 0
+        self.last_missing = -1 - window
+
+    def update(self, value):
+        if math.isnan(value):
+            self.last_missing = self.count
+        elif self.use_max:
+            while self.queue and self.queue[-1][1] <= value:
+                self.queue.pop()
+        else:
+            while self.queue and self.queue[-1][1] >= value:
+                self.queue.pop()
+        if not math.isnan(value):
+            self.queue.append((self.count, value))
+        while self.queue and self.queue[0][0] <= self.count - self.window:
+            self.queue.popleft()
+        self.count += 1
+
+    def value(self):
+        if self.count < self.window or self.last_missing >= self.count - self.window:
+            return math.nan
+        return self.queue[0][1]
+
+
+class _Ema:
+    """
+    Moyenne exponentielle (adjust=False) démarrant à la première valeur valide,
+    NaN tant que min_periods valeurs n'ont pas été vues (comme pandas.ewm). Sur une valeur
+    manquante, la valeur précédente est reportée et son poids continue de décroître.
+    """
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.current = math.nan
+        self.weight = 1.0
+        self.count = 0
+
+    def update(self, value):
+        if self.count > 0:
+            self.weight *= 1 - self.alpha
+        if math.isnan(value):
+            return self.value()
+        if self.count == 0:
+            self.current = value
+        else:
+            self.current = (self.weight * self.current + self.alpha * value) / (self.weight + self.alpha)
+        self.weight = 1.0
+        self.count += 1
+        return self.value()
+
+    def value(self):
+        return self.current if self.count >= self.min_periods else math.nan
+
+
+class _Rsi:
+    """
+    RSI de Wilder identique à ta.momentum.rsi (les variations NaN comptent comme 0).
+    """
+
+    def __init__(self, window=14):
+        self.previous = math.nan
+        self.up = _Ema(1 / window, window)
+        self.down = _Ema(1 / window, window)
+
+    def update(self, value):
+        diff = value - self.previous
+        self.previous = value
+        if math.isnan(diff):
+            diff = 0.0
+        up = self.up.update(max(diff, 0.0))
+        down = self.down.update(max(-diff, 0.0))
+        if math.isnan(down):
+            return math.nan
+        if down == 0:
+            return 100.0
+        return 100 - 100 / (1 + up / down)
+
+
+class _Atr:
+    """
+    ATR identique à ta.volatility.average_true_range: 0 avant la fenêtre,
+    moyenne des true ranges valides de la première fenêtre, puis lissage de Wilder
+    (un true range manquant se propage ensuite, comme dans `ta`).
+    """
+
+    def __init__(self, window=14):
+        self.window = window
+        self.previous_close = math.nan
+        self.count = 0
+        self.seed_total = 0.0
+        self.seed_count = 0
+        self.current = 0.0
+
+    def update(self, high, low, close):
+        ranges = [r for r in (high - low, abs(high - self.previous_close), abs(low - self.previous_close))
+                  if not math.isnan(r)]
+        true_range = max(ranges) if ranges else math.nan
+        self.previous_close = close
+
+        self.count += 1
+        if self.count <= self.window:
+            if not math.isnan(true_range):
+                self.seed_total += true_range
+                self.seed_count += 1
+            if self.count < self.window:
+                self.current = 0.0
+            else:
+                self.current = self.seed_total / self.seed_count if self.seed_count else math.nan
+        else:
+            self.current = (self.current * (self.window - 1) + true_range) / self.window
+        return self.current
+
+
+class IndicatorState:
+    """
+    État incrémental des indicateurs de calculate_indicators.
+    Chaque nouvelle barre est intégrée en temps constant via update(bar), qui retourne
+    la ligne d'indicateurs et de signaux correspondante. Les valeurs suivent le calcul
+    par lot (ta) à la précision flottante près.
+    """
+
+    def __init__(self):
+        self.sma20 = _RollingMean(20)
+        self.sma50 = _RollingMean(50)
+        self.ema_fast = _Ema(2 / (12 + 1), 12)
+        self.ema_slow = _Ema(2 / (26 + 1), 26)
+        self.macd_signal = _Ema(2 / (9 + 1), 9)
+        self.rsi = _Rsi(14)
+        self.bollinger = _RollingMean(20)
+        self.atr = _Atr(14)
+        self.stoch_low = _RollingExtremum(14, use_max=False)
+        self.stoch_high = _RollingExtremum(14, use_max=True)
+        self.stoch_d = _RollingMean(3)
+        self.roc_window = deque(maxlen=13)
+        self.vwap_pv = 0.0
+        self.vwap_volume = 0.0
+        self.previous_close = math.nan
+        self.previous_sp500 = math.nan
+        self.crsi = _Rsi(14)
+        self.last = None
+
+    @classmethod
+    def from_history(cls, df):
+        """
+        Construit l'état à partir d'un historique OHLCV (colonnes Close, High, Low, Volume, SP500).
+        """
+        state = cls()
+        has_sp500 = 'SP500' in df.columns
+        columns = [df[col].to_numpy(dtype=np.float64) for col in ['Close', 'High', 'Low', 'Volume']]
+        sp500 = df['SP500'].to_numpy(dtype=np.float64) if has_sp500 else np.full(len(df), np.nan)
+        for close, high, low, volume, sp in zip(*columns, sp500):
+            state.update({'Close': close, 'High': high, 'Low': low, 'Volume': volume, 'SP500': sp})
+        return state
+
+    def update(self, bar):
+        """
+        Intègre une nouvelle barre et retourne un dict des indicateurs et des codes de signal.
+        """
+        close = float(bar['Close'])
+        high = float(bar['High'])
+        low = float(bar['Low'])
+        volume = float(bar['Volume'])
+        sp500 = float(bar.get('SP500', math.nan))
+
+        row = {}
+
+        # Moyennes mobiles
+        self.sma20.update(close)
+        self.sma50.update(close)
+        row['SMA20'] = self.sma20.mean()
+        row['SMA50'] = self.sma50.mean()
+
+        # MACD
+        macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+        row['MACD'] = macd
+        row['MACD_Signal'] = self.macd_signal.update(macd)
+
+        # RSI
+        row['RSI'] = self.rsi.update(close)
+
+        # Bollinger Bands
+        self.bollinger.update(close)
+        middle = self.bollinger.mean()
+        deviation = self.bollinger.std()
+        row['BB_Upper'] = middle + 2 * deviation
+        row['BB_Middle'] = middle
+        row['BB_Lower'] = middle - 2 * deviation
+
+        # ATR
+        row['ATR'] = self.atr.update(high, low, close)
+
+        # Stochastique
+        self.stoch_low.update(low)
+        self.stoch_high.update(high)
+        lowest = self.stoch_low.value()
+        highest = self.stoch_high.value()
+        stoch_k = 100 * (close - lowest) / (highest - lowest) if highest != lowest else math.nan
+        row['Stoch_K'] = stoch_k
+        self.stoch_d.update(stoch_k)
+        row['Stoch_D'] = self.stoch_d.mean()
+
+        # Momentum
+        self.roc_window.append(close)
+        if len(self.roc_window) == self.roc_window.maxlen:
+            reference = self.roc_window[0]
+            row['Momentum'] = (close - reference) / reference * 100
+        else:
+            row['Momentum'] = math.nan
+
+        # VWAP (comme pandas cumsum: une barre manquante vaut NaN sans interrompre le cumul)
+        traded = close * volume
+        if not math.isnan(traded):
+            self.vwap_pv += traded
+        if not math.isnan(volume):
+            self.vwap_volume += volume
+        if math.isnan(traded) or math.isnan(volume) or not self.vwap_volume:
+            row['VWAP'] = math.nan
+        else:
+            row['VWAP'] = self.vwap_pv / self.vwap_volume
+
+        # CRSI (Comparaison avec SP500)
+        close_return = close / self.previous_close - 1
+        sp500_return = sp500 / self.previous_sp500 - 1
+        self.previous_close = close
+        self.previous_sp500 = sp500
+        row['CRSI'] = self.crsi.update(close_return - sp500_return)
+
+        # Signaux
+        codes = compute_signal_codes(
+            close, row['SMA20'], row['SMA50'], row['MACD'], row['MACD_Signal'], row['RSI'],
+            row['BB_Upper'], row['BB_Lower'], stoch_k, row['Stoch_D'], row['Momentum'],
+            row['CRSI'], row['VWAP']
+        )
+        for indicator in SIGNAL_INDICATORS:
+            row[f'Signal_{indicator}'] = int(codes[indicator])
+        row['Signal_Score'] = sum(row[f'Signal_{ind}'] for ind in SIGNAL_INDICATORS)
+
+        self.last = row
+        return row
@@ -0,0 +1,152 @@
+"""
+Instrumentation légère du pipeline: chronomètres par étape, compteurs et journalisation,
+désactivés par défaut.
+
+    from instrumentation import INSTRUMENTATION, configure_logging
+    INSTRUMENTATION.enable()
+    configure_logging(logging.DEBUG)
+    run_analysis("NVDA", 180)
+    INSTRUMENTATION.to_json("timings.json")
+"""
+import functools
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+
+# Racine des loggers du module trading; silencieux tant que configure_logging n'est pas appelé
+LOGGER_NAME = 'trading'
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+
+def get_logger(name):
+    """
+    Retourne le logger `trading.<name>`.
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+class StageFormatter(logging.Formatter):
+    """
+    Ajoute les champs stage/duration_ms au message quand ils sont présents dans l'enregistrement.
+    """
+
+    def format(self, record):
+        message = super().format(record)
+        if hasattr(record, 'stage'):
+            message += f" [stage={record.stage} duration_ms={record.duration_ms:.2f}]"
+        return message
+
+
+def configure_logging(level=logging.INFO, stream=None):
+    """
+    Active l'affichage des logs du module trading au niveau donné.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if not isinstance(handler, logging.NullHandler):
+            logger.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(StageFormatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    return logger
+
+
+_stage_logger = get_logger('stages')
+
+
+class Instrumentation:
+    """
+    Collecte les durées des étapes et des compteurs; ne coûte qu'un test de booléen quand elle est désactivée.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.timings = defaultdict(list)
+        self.counters = Counter()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.timings.clear()
+        self.counters.clear()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Chronomètre le bloc `with` sous le nom d'étape donné.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name].append(time.perf_counter() - start)
+
+    def count(self, name, value=1):
+        """
+        Incrémente un compteur.
+        """
+        if self.enabled:
+            self.counters[name] += value
+
+    def report(self):
+        """
+        Retourne un dict sérialisable {stages: {nom: statistiques}, counters: {...}}.
+        """
+        stages = {}
+        for name, durations in self.timings.items():
+            stages[name] = {
+                'calls': len(durations),
+                'total_s': sum(durations),
+                'mean_s': sum(durations) / len(durations),
+                'max_s': max(durations)
+            }
+        return {'stages': stages, 'counters': dict(self.counters)}
+
+    def to_json(self, path=None):
+        """
+        Exporte le rapport en JSON (chaîne retournée, et écrite dans `path` si fourni).
+        """
+        content = json.dumps(self.report(), indent=2)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        return content
+
+
+# Instance partagée par tout le module d'analyse
+INSTRUMENTATION = Instrumentation()
+
+
+def instrumented(name):
+    """
+    Décorateur qui chronomètre chaque appel de la fonction sous l'étape `name`
+    et journalise sa durée au niveau DEBUG.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            log_enabled = _stage_logger.isEnabledFor(logging.DEBUG)
+            if not INSTRUMENTATION.enabled and not log_enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                if INSTRUMENTATION.enabled:
+                    INSTRUMENTATION.timings[name].append(duration)
+                if log_enabled:
+                    _stage_logger.debug("Fin de %s", name, extra={'stage': name, 'duration_ms': duration * 1000})
+        return wrapper
+    return decorator
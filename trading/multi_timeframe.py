@@ -0,0 +1,130 @@
+"""
+Analyse multi-unités de temps à partir d'une seule série de base (la plus fine disponible).
+
+La série de base est agrégée vers des unités supérieures (open first, high max, low min,
+close last, volume sum), les indicateurs et signaux sont calculés pour chaque unité, puis
+réalignés sur l'index de base sans information future: chaque barre de base ne voit que
+la dernière barre supérieure déjà clôturée. Les barres supérieures clôturées sont gardées
+en cache; seule la barre en cours est recalculée quand de nouvelles barres arrivent.
+"""
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+
+from technical_analisis import (
+    INDICATOR_COLUMNS, REFERENCE_COLUMNS, SIGNAL_INDICATORS, calculate_indicators, generate_signals
+)
+
+OHLCV_AGGREGATION = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def _aggregation(df):
+    aggregation = {col: how for col, how in OHLCV_AGGREGATION.items() if col in df.columns}
+    aggregation.update({col: 'last' for col in REFERENCE_COLUMNS if col in df.columns})
+    return aggregation
+
+
+def _resampler(df, rule):
+    # Unités fixes (h, min, ...): origin='epoch' rend les intervalles indépendants du début
+    # de la série (indispensable au cache); les unités calendaires (W, ME) sont déjà ancrées
+    if isinstance(to_offset(rule), Tick):
+        return df.resample(rule, origin='epoch')
+    return df.resample(rule)
+
+
+def resample_ohlcv(df, rule):
+    """
+    Agrège un DataFrame OHLCV (et ses colonnes de référence) vers l'unité de temps `rule`
+    ('W', 'ME', '4h', ...). Les intervalles sans barre de base sont supprimés.
+    """
+    return _resampler(df, rule).agg(_aggregation(df)).dropna(subset=['Close'])
+
+
+def bin_labels(index, rule):
+    """
+    Étiquette de la barre supérieure à laquelle appartient chaque date de l'index de base.
+    """
+    labels = np.empty(len(index), dtype='datetime64[ns]')
+    positions = pd.Series(np.arange(len(index)), index=index)
+    for label, members in _resampler(positions, rule).indices.items():
+        labels[members] = np.datetime64(pd.Timestamp(label).tz_localize(None), 'ns')
+    return pd.DatetimeIndex(labels)
+
+
+class TimeframeCache:
+    """
+    Barres agrégées d'une unité de temps: les barres clôturées sont conservées,
+    seule la dernière (en cours) est recalculée à chaque mise à jour.
+    """
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.closed = None
+        self.open_start = None
+
+    def update(self, base):
+        """
+        Intègre la série de base (complète ou prolongée) et retourne toutes les barres agrégées,
+        la dernière étant la barre en cours.
+        """
+        tail = base if self.open_start is None else base[base.index >= self.open_start]
+        groups = _resampler(tail, self.rule).indices
+        aggregated = resample_ohlcv(tail, self.rule)
+        if aggregated.empty:
+            return self.closed if self.closed is not None else aggregated
+
+        # La dernière barre est considérée ouverte: elle sera recalculée à la prochaine mise à jour
+        open_label = aggregated.index[-1]
+        self.open_start = tail.index[min(groups[open_label])]
+        new_closed = aggregated.iloc[:-1]
+        self.closed = new_closed if self.closed is None else pd.concat([self.closed, new_closed])
+        return pd.concat([self.closed, aggregated.iloc[-1:]])
+
+    def reset(self):
+        self.closed = None
+        self.open_start = None
+
+
+class MultiTimeframe:
+    """
+    Calcule indicateurs et signaux pour plusieurs unités de temps et les réaligne sur la série de base.
+    Les colonnes ajoutées sont suffixées par l'unité (ex. RSI_W, Signal_SMA_ME).
+    """
+
+    def __init__(self, rules=('W', 'ME'), backend='numpy'):
+        self.rules = list(rules)
+        self.backend = backend
+        self.caches = {rule: TimeframeCache(rule) for rule in self.rules}
+        self.frames = {}
+
+    def update(self, base):
+        """
+        Retourne une copie de `base` enrichie des colonnes de chaque unité supérieure.
+        Les DataFrames par unité (barre en cours incluse) restent disponibles dans self.frames.
+        """
+        result = base.copy()
+        for rule in self.rules:
+            bars = self.caches[rule].update(base)
+            frame = generate_signals(calculate_indicators(bars.copy(), backend=self.backend))
+            self.frames[rule] = frame
+
+            # Chaque barre de base utilise la barre supérieure précédente, déjà clôturée
+            columns = INDICATOR_COLUMNS + [f'Signal_{ind}' for ind in SIGNAL_INDICATORS] + ['Signal_Score']
+            previous = frame[columns].shift(1)
+            previous.index = previous.index.tz_localize(None) if previous.index.tz is not None else previous.index
+            aligned = previous.reindex(bin_labels(base.index, rule))
+            for col in columns:
+                values = aligned[col].to_numpy()
+                if col.startswith('Signal_'):
+                    values = np.nan_to_num(values).astype(np.int8)
+                result[f'{col}_{rule}'] = values
+        return result
+
+
+def multi_timeframe_analysis(df, rules=('W', 'ME'), backend='numpy'):
+    """
+    Analyse ponctuelle: retourne (DataFrame de base enrichi, {unité: DataFrame agrégé analysé}).
+    """
+    analysis = MultiTimeframe(rules, backend=backend)
+    return analysis.update(df), analysis.frames
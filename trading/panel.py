@@ -0,0 +1,175 @@
+"""
+Mode panel: tout un univers de tickers sous forme de tableaux alignés (temps x ticker).
+
+Les indicateurs et les règles de signal sont calculés colonne par colonne en une seule
+passe vectorisée (indicator_kernels et compute_signal_codes acceptent des tableaux 2-D),
+ce qui évite la surcharge pandas d'une analyse ticker par ticker. Seuls les tableaux
+NumPy sont conservés: la mémoire par symbole reste proche de la taille des données brutes.
+"""
+import numpy as np
+import pandas as pd
+
+import indicator_kernels as kernels
+from data_sources import REFERENCE_SYMBOLS, YahooDataSource
+from technical_analisis import (
+    SIGNAL_INDICATORS, SIGNAL_LABELS, _date_range, _reference_closes, align_to_calendar,
+    compute_signal_codes
+)
+
+PRICE_FIELDS = ['Close', 'High', 'Low', 'Volume']
+
+
+class Panel:
+    """
+    Prix d'un univers alignés sur un index de dates commun.
+    Les attributs close, high, low et volume sont des tableaux (temps x ticker);
+    sp500 est la série de référence normalisée (temps,). present (temps x ticker) indique
+    les barres réellement cotées de chaque ticker (faux avant sa cotation ou un jour manquant).
+    """
+
+    def __init__(self, index, tickers, close, high, low, volume, sp500, present=None):
+        self.index = index
+        self.tickers = list(tickers)
+        self.close = close
+        self.high = high
+        self.low = low
+        self.volume = volume
+        self.sp500 = sp500
+        self.present = ~np.isnan(close) if present is None else present
+        self.indicators = {}
+        self.signals = {}
+
+    @classmethod
+    def from_frames(cls, frames, sp500=None):
+        """
+        Construit le panel à partir d'un dict {ticker: DataFrame OHLCV}.
+        sp500 (Series de clôtures brutes) est aligné sur l'union des dates de cotation.
+        """
+        frames = {ticker: df for ticker, df in frames.items() if df is not None and not df.empty}
+        index = pd.DatetimeIndex(sorted(set().union(*(df.index for df in frames.values()))))
+        tickers = list(frames)
+
+        arrays = {field: np.full((len(index), len(tickers)), np.nan) for field in PRICE_FIELDS}
+        present = np.zeros((len(index), len(tickers)), dtype=bool)
+        for j, ticker in enumerate(tickers):
+            df = frames[ticker]
+            positions = index.get_indexer(df.index)
+            present[positions, j] = True
+            for field in PRICE_FIELDS:
+                arrays[field][positions, j] = df[field].to_numpy(dtype=np.float64)
+
+        if sp500 is None:
+            reference = np.full(len(index), np.nan)
+        else:
+            reference = align_to_calendar(sp500, index)
+            valid = reference[~np.isnan(reference)]
+            if len(valid):
+                reference = reference / valid[0]
+
+        return cls(index, tickers, arrays['Close'], arrays['High'], arrays['Low'], arrays['Volume'], reference, present)
+
+    def compute_indicators(self):
+        """
+        Calcule tous les indicateurs pour tous les tickers; retourne un dict {nom: tableau 2-D}.
+        Chaque ticker n'est calculé que sur ses propres barres, comme l'analyse ticker par ticker:
+        les lignes de remplissage (NaN) ne sont jamais vues par les noyaux. Les tickers ayant
+        exactement les mêmes barres sont regroupés pour rester vectorisés (un seul groupe si
+        l'univers est parfaitement aligné). Les lignes absentes valent NaN.
+        """
+        groups = {}
+        for j in range(len(self.tickers)):
+            groups.setdefault(self.present[:, j].tobytes(), []).append(j)
+
+        self.indicators = {}
+        for columns in groups.values():
+            rows = np.flatnonzero(self.present[:, columns[0]])
+            cells = np.ix_(rows, columns)
+            results = kernels.compute_indicators(
+                self.close[cells], self.high[cells], self.low[cells], self.volume[cells], self.sp500[rows][:, None]
+            )
+            for name, values in results.items():
+                if name not in self.indicators:
+                    self.indicators[name] = np.full(self.close.shape, np.nan)
+                self.indicators[name][cells] = values
+        return self.indicators
+
+    def compute_signals(self):
+        """
+        Évalue les règles de signal sur tout le panel; retourne un dict {indicateur: codes int8 2-D}
+        plus 'Score' (somme des codes). Les lignes absentes d'un ticker valent 0.
+        """
+        if not self.indicators:
+            self.compute_indicators()
+        ind = self.indicators
+        self.signals = compute_signal_codes(
+            self.close, ind['SMA20'], ind['SMA50'], ind['MACD'], ind['MACD_Signal'], ind['RSI'],
+            ind['BB_Upper'], ind['BB_Lower'], ind['Stoch_K'], ind['Stoch_D'], ind['Momentum'],
+            ind['CRSI'], ind['VWAP']
+        )
+        self.signals['Score'] = np.sum([self.signals[name] for name in SIGNAL_INDICATORS], axis=0, dtype=np.int8)
+        for name in self.signals:
+            self.signals[name][~self.present] = 0
+        return self.signals
+
+    def last(self, name):
+        """
+        Dernière valeur valide de chaque ticker pour un indicateur ou un signal, sous forme de Series
+        (les lignes où le ticker n'a pas de barre sont ignorées).
+        """
+        values = self.indicators[name] if name in self.indicators else self.signals[name]
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values) & self.present
+        has_value = valid.any(axis=0)
+        last_row = len(values) - 1 - np.argmax(valid[::-1], axis=0)
+        result = np.where(has_value, values[last_row, np.arange(values.shape[1])], np.nan)
+        return pd.Series(result, index=self.tickers, name=name)
+
+    def rank(self, name, top=20, ascending=False):
+        """
+        Classement transversal des tickers sur la dernière valeur d'un indicateur ou d'un signal.
+        """
+        return self.last(name).dropna().sort_values(ascending=ascending).head(top)
+
+    def top_crsi_divergence(self, top=20):
+        """
+        Tickers dont le CRSI (RSI des rendements relatifs au SP500) s'écarte le plus de 50,
+        c'est-à-dire dont la force relative diverge le plus de l'indice.
+        """
+        crsi = self.last('CRSI')
+        divergence = (crsi - 50).dropna()
+        order = divergence.abs().sort_values(ascending=False).index[:top]
+        return pd.DataFrame({'CRSI': crsi[order], 'Divergence': divergence[order]})
+
+    def summary(self):
+        """
+        Résumé de la dernière barre de chaque ticker: libellé de chaque règle et score.
+        """
+        if not self.signals:
+            self.compute_signals()
+        has_bar = self.present.any(axis=0)
+        last_row = len(self.present) - 1 - np.argmax(self.present[::-1], axis=0)
+        columns = np.arange(len(self.tickers))
+        table = pd.DataFrame({
+            ind: [SIGNAL_LABELS[int(code)] for code in self.signals[ind][last_row, columns]] for ind in SIGNAL_INDICATORS
+        }, index=self.tickers)
+        table['Score'] = self.signals['Score'][last_row, columns]
+        return table[has_bar]
+
+    def nbytes(self):
+        """
+        Mémoire occupée par les tableaux de prix, d'indicateurs et de signaux (octets).
+        """
+        arrays = [self.close, self.high, self.low, self.volume, self.sp500, self.present]
+        arrays += list(self.indicators.values()) + list(self.signals.values())
+        return sum(array.nbytes for array in arrays)
+
+
+def load_panel(tickers, days=180, source=None):
+    """
+    Télécharge l'univers et le SP500 en un appel groupé et construit le panel.
+    """
+    source = source or YahooDataSource()
+    start_date, end_date = _date_range(days)
+    frames = source.download(list(tickers) + list(REFERENCE_SYMBOLS.values()), start_date, end_date)
+    references = _reference_closes(frames)
+    return Panel.from_frames({ticker: frames.get(ticker) for ticker in tickers}, sp500=references['SP500'])
@@ -0,0 +1,234 @@
+"""
+Recherche de paramètres (fenêtres et seuils des indicateurs) évaluée par backtest.
+
+Les briques communes sont calculées une fois par série et réutilisées par toute la grille:
+sommes cumulées (SMA et écart-type de Bollinger de n'importe quelle fenêtre en O(N)),
+gains/pertes pour le RSI, EMA, min/max glissants et indicateurs fixes (Momentum, VWAP, CRSI)
+mis en cache par fenêtre. Les prix sont partagés avec les processus de travail via
+multiprocessing.shared_memory au lieu d'être copiés pour chaque tâche.
+"""
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import indicator_kernels as kernels
+from backtest import _metrics, _positions
+from technical_analisis import SIGNAL_INDICATORS, compute_signal_codes
+
+# Grille par défaut autour des valeurs codées dans calculate_indicators et compute_signal_codes
+DEFAULT_GRID = {
+    'sma_fast': [10, 20, 30],
+    'sma_slow': [50, 100],
+    'macd_fast': [12],
+    'macd_slow': [26],
+    'macd_signal': [9],
+    'rsi_window': [7, 14, 21],
+    'rsi_low': [25, 30],
+    'rsi_high': [70, 75],
+    'bb_window': [20],
+    'bb_dev': [2.0, 2.5],
+    'stoch_window': [14],
+    'stoch_low': [20],
+    'stoch_high': [80],
+    'threshold': [1, 2, 3]
+}
+
+PRICE_COLUMNS = ['Close', 'High', 'Low', 'Volume', 'SP500']
+
+
+class SweepBlocks:
+    """
+    Briques de calcul partagées par toutes les combinaisons d'une même série de prix.
+    """
+
+    def __init__(self, prices):
+        self.close, self.high, self.low, self.volume, self.sp500 = prices
+        n = len(self.close)
+
+        # Sommes cumulées centrées: SMA et variance de n'importe quelle fenêtre par différence.
+        # Les NaN comptent pour 0 dans les sommes et sont comptés à part: comme pandas
+        # (min_periods=window), une fenêtre contenant une valeur manquante donne NaN
+        missing = np.isnan(self.close)
+        self._offset = np.nanmean(self.close)
+        centered = np.where(missing, 0.0, self.close - self._offset)
+        self._cumsum = np.concatenate([[0.0], np.cumsum(centered)])
+        self._cumsum_sq = np.concatenate([[0.0], np.cumsum(centered * centered)])
+        self._missing = np.concatenate([[0], np.cumsum(missing)])
+
+        # Gains/pertes du RSI et indicateurs sans paramètre
+        diff = np.diff(self.close, prepend=np.nan)
+        diff = np.where(np.isnan(diff), 0.0, diff)
+        self.gains = np.maximum(diff, 0.0)
+        self.losses = np.maximum(-diff, 0.0)
+        self.returns = np.zeros(n)
+        self.returns[1:] = np.nan_to_num(self.close[1:] / self.close[:-1] - 1.0)
+        self.momentum = kernels.roc(self.close)
+        self.vwap = kernels.vwap(self.close, self.volume)
+        self.crsi = kernels.rsi(kernels.pct_change(self.close) - kernels.pct_change(self.sp500))
+
+        self._cache = {}
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _window_sums(self, cumsum, window):
+        sums = np.full(len(self.close), np.nan)
+        if window <= len(self.close):
+            sums[window - 1:] = cumsum[window:] - cumsum[:-window]
+            incomplete = (self._missing[window:] - self._missing[:-window]) > 0
+            sums[window - 1:][incomplete] = np.nan
+        return sums
+
+    def sma(self, window):
+        return self._cached(('sma', window),
+                            lambda: self._window_sums(self._cumsum, window) / window + self._offset)
+
+    def std(self, window):
+        def compute():
+            mean = self._window_sums(self._cumsum, window) / window
+            mean_sq = self._window_sums(self._cumsum_sq, window) / window
+            return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+        return self._cached(('std', window), compute)
+
+    def ema(self, span):
+        return self._cached(('ema', span), lambda: kernels.ema(self.close, span=span))
+
+    def macd(self, fast, slow, signal):
+        def compute():
+            line = self.ema(fast) - self.ema(slow)
+            return line, kernels.ema(line, span=signal)
+        return self._cached(('macd', fast, slow, signal), compute)
+
+    def rsi(self, window):
+        def compute():
+            up = kernels.ema(self.gains, alpha=1.0 / window, min_periods=window)
+            down = kernels.ema(self.losses, alpha=1.0 / window, min_periods=window)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result = np.where(down == 0, 100.0, 100.0 - 100.0 / (1.0 + up / down))
+            return np.where(np.isnan(down), np.nan, result)
+        return self._cached(('rsi', window), compute)
+
+    def stochastic(self, window, smooth_window=3):
+        def compute():
+            lowest = kernels.rolling_min(self.low, window)
+            highest = kernels.rolling_max(self.high, window)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                stoch_k = 100 * (self.close - lowest) / (highest - lowest)
+            return stoch_k, kernels.rolling_mean(stoch_k, smooth_window)
+        return self._cached(('stoch', window, smooth_window), compute)
+
+    def score(self, params):
+        """
+        Somme des codes des huit règles pour un jeu de paramètres.
+        """
+        middle = self.sma(params['bb_window'])
+        deviation = params['bb_dev'] * self.std(params['bb_window'])
+        macd, macd_signal = self.macd(params['macd_fast'], params['macd_slow'], params['macd_signal'])
+        stoch_k, stoch_d = self.stochastic(params['stoch_window'])
+        codes = compute_signal_codes(
+            self.close, self.sma(params['sma_fast']), self.sma(params['sma_slow']), macd, macd_signal,
+            self.rsi(params['rsi_window']), middle + deviation, middle - deviation, stoch_k, stoch_d,
+            self.momentum, self.crsi, self.vwap,
+            rsi_low=params['rsi_low'], rsi_high=params['rsi_high'],
+            stoch_low=params['stoch_low'], stoch_high=params['stoch_high']
+        )
+        return np.sum([codes[ind] for ind in SIGNAL_INDICATORS], axis=0, dtype=np.int16)
+
+
+def expand_grid(grid):
+    """
+    Produit cartésien d'une grille {paramètre: valeurs} en liste de dicts,
+    sans les combinaisons incohérentes (fenêtre rapide >= lente, seuil bas >= haut).
+    """
+    grid = {**DEFAULT_GRID, **grid}
+    names = list(grid)
+    combinations = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        if params['sma_fast'] >= params['sma_slow'] or params['macd_fast'] >= params['macd_slow']:
+            continue
+        if params['rsi_low'] >= params['rsi_high'] or params['stoch_low'] >= params['stoch_high']:
+            continue
+        combinations.append(params)
+    return combinations
+
+
+def _evaluate(blocks, combinations, cost, long_only, periods_per_year):
+    """
+    Backteste chaque combinaison sur les briques partagées.
+    """
+    rows = []
+    for params in combinations:
+        start = time.perf_counter()
+        positions = _positions(blocks.score(params)[:, None], params['threshold'], long_only)
+        metrics = _metrics(positions, blocks.returns, cost, periods_per_year)
+        row = dict(params)
+        row.update({name: float(values[0]) for name, values in metrics.items()})
+        row['Secondes'] = time.perf_counter() - start
+        rows.append(row)
+    return rows
+
+
+# État des processus de travail: segment partagé et briques construites une seule fois
+_worker = {}
+
+
+def _init_worker(name, shape):
+    shm = shared_memory.SharedMemory(name=name)
+    prices = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _worker['shm'] = shm
+    _worker['blocks'] = SweepBlocks(prices)
+
+
+def _evaluate_in_worker(combinations, cost, long_only, periods_per_year):
+    return _evaluate(_worker['blocks'], combinations, cost, long_only, periods_per_year)
+
+
+def parameter_sweep(df, grid=None, cost=0.0, long_only=False, workers=None, chunk_size=64,
+                    periods_per_year=252):
+    """
+    Évalue une grille de paramètres sur un DataFrame OHLCV (avec colonne SP500).
+    workers<=1 exécute tout dans le processus courant; sinon les combinaisons sont réparties
+    par paquets de chunk_size sur un pool de processus lisant les prix en mémoire partagée.
+    Retourne un DataFrame trié par Sharpe décroissant; les temps globaux sont dans result.attrs['timings'].
+    """
+    start = time.perf_counter()
+    combinations = expand_grid(grid or {})
+    prices = np.ascontiguousarray(
+        np.vstack([df[col].to_numpy(dtype=np.float64) for col in PRICE_COLUMNS])
+    )
+
+    if workers is not None and workers <= 1:
+        blocks = SweepBlocks(prices)
+        prepared = time.perf_counter()
+        rows = _evaluate(blocks, combinations, cost, long_only, periods_per_year)
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=prices.nbytes)
+        try:
+            np.ndarray(prices.shape, dtype=np.float64, buffer=shm.buf)[:] = prices
+            prepared = time.perf_counter()
+            chunks = [combinations[i:i + chunk_size] for i in range(0, len(combinations), chunk_size)]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shm.name, prices.shape)) as executor:
+                futures = [executor.submit(_evaluate_in_worker, chunk, cost, long_only, periods_per_year)
+                           for chunk in chunks]
+                rows = [row for future in futures for row in future.result()]
+        finally:
+            shm.close()
+            shm.unlink()
+
+    results = pd.DataFrame(rows).sort_values('Sharpe', ascending=False, ignore_index=True)
+    end = time.perf_counter()
+    results.attrs['timings'] = {
+        'combinaisons': len(combinations),
+        'preparation_s': prepared - start,
+        'evaluation_s': end - prepared,
+        'total_s': end - start
+    }
+    return results
@@ -1,171 +1,260 @@
-import yfinance as yf
+import logging
+
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import ta
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+import indicator_kernels
+from data_sources import REFERENCE_SYMBOLS, CachedDataSource, ConcurrentDataSource, YahooDataSource
+from instrumentation import INSTRUMENTATION, configure_logging, get_logger, instrumented
+
+logger = get_logger('technical_analisis')
+
 
-def prepare_data(ticker, days):
+def _date_range(days):
     """
-    Prépare et nettoie les données pour l'analyse technique.
+    Retourne la fenêtre (start, end) couvrant les `days` derniers jours.
     """
-    print("\n=== Début prepare_data ===")
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
+    return start_date, end_date
+
+
+def _reference_closes(frames):
+    """
+    Extrait les séries de clôture des indices de référence d'un dict {symbole: DataFrame}.
+    """
+    references = {}
+    for column, symbol in REFERENCE_SYMBOLS.items():
+        close = frames[symbol]['Close'] if not frames[symbol].empty else pd.Series(dtype=float)
+        if isinstance(close, pd.DataFrame):
+            close = close.squeeze(axis=1)
+        references[column] = close
+    return references
+
+
+def align_to_calendar(series, index):
+    """
+    Aligne une série de référence sur le calendrier de cotation du ticker.
+    Chaque date prend la dernière valeur connue à cette date (pas d'information future),
+    les fuseaux horaires sont retirés pour comparer des dates de même nature.
+    """
+    series = series.copy()
+    if getattr(series.index, 'tz', None) is not None:
+        series.index = series.index.tz_localize(None)
+    if getattr(index, 'tz', None) is not None:
+        index = index.tz_localize(None)
+    series = series[~series.index.duplicated(keep='last')].sort_index()
+    return series.reindex(series.index.union(index)).ffill().reindex(index).to_numpy()
+
+
+def attach_references(df, references):
+    """
+    Ajoute VIX et les indices normalisés (SP500, NASDAQ, DOW) au DataFrame du ticker,
+    alignés sur ses dates de cotation.
+    """
+    df['VIX'] = align_to_calendar(references['VIX'], df.index)
+    for column in ['SP500', 'NASDAQ', 'DOW']:
+        aligned = align_to_calendar(references[column], df.index)
+        valid = aligned[~np.isnan(aligned)]
+        df[column] = aligned / valid[0] if len(valid) else aligned
+    return df
+
+
+@instrumented('prepare_data')
+def prepare_data(ticker, days, source=None):
+    """
+    Prépare et nettoie les données pour l'analyse technique.
+    """
+    logger.debug("Début prepare_data pour %s (%s jours)", ticker, days)
+    source = source or ConcurrentDataSource()
+    start_date, end_date = _date_range(days)
     
-    # Télécharger les données principales
-    df = yf.download(ticker, start=start_date, end=end_date)
+    # Télécharger les données principales et de référence en un seul appel
+    frames = source.download([ticker] + list(REFERENCE_SYMBOLS.values()), start_date, end_date)
+    df = frames[ticker]
     if df.empty:
         raise ValueError(f"Pas de données trouvées pour {ticker}")
-
-    # Supprimer le multi-index si présent
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-    
-    print(f"Colonnes après nettoyage: {df.columns.tolist()}")
-    
-    # Télécharger les données de référence
-    vix = yf.download("^VIX", start=start_date, end=end_date)['Close']
-    sp500 = yf.download("^GSPC", start=start_date, end=end_date)['Close']
-    nasdaq = yf.download("^IXIC", start=start_date, end=end_date)['Close']
-    dow = yf.download("^DJI", start=start_date, end=end_date)['Close']
-    
-    # Supprimer les multi-index des indices si présents
-    for series in [vix, sp500, nasdaq, dow]:
-        if isinstance(series, pd.DataFrame):
-            series = series.squeeze()
     
     # Normaliser les indices
-    df['VIX'] = vix
-    df['SP500'] = sp500 / sp500.iloc[0]
-    df['NASDAQ'] = nasdaq / nasdaq.iloc[0]
-    df['DOW'] = dow / dow.iloc[0]
+    df = attach_references(df.copy(), _reference_closes(frames))
     
-    print("Structure finale du DataFrame:")
-    print(f"Shape: {df.shape}")
-    print(f"Colonnes: {df.columns.tolist()}")
-    print(f"Index type: {type(df.index)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Structure finale du DataFrame: shape=%s colonnes=%s index=%s",
+                     df.shape, df.columns.tolist(), type(df.index).__name__)
     
     return df
 
-def calculate_indicators(df):
+@instrumented('calculate_indicators')
+def calculate_indicators(df, backend='ta'):
     """
     Calcule tous les indicateurs techniques.
+    backend='ta' utilise la librairie ta, backend='numpy' les noyaux de indicator_kernels.
     """
-    print("\n=== Début calculate_indicators ===")
+    logger.debug("Début calculate_indicators (%d barres, backend %s)", len(df), backend)
+    INSTRUMENTATION.count('bars', len(df))
     try:
+        if backend == 'numpy':
+            arrays = [df[col].to_numpy(dtype=np.float64) for col in ['Close', 'High', 'Low', 'Volume', 'SP500']]
+            for name, values in indicator_kernels.compute_indicators(*arrays).items():
+                df[name] = values
+            return df
+        if backend != 'ta':
+            raise ValueError(f"Backend inconnu: {backend}")
+
         # S'assurer que toutes les colonnes nécessaires sont des Series
         for col in ['Close', 'High', 'Low', 'Volume']:
             if isinstance(df[col], pd.DataFrame):
                 df[col] = df[col].squeeze()
                 
-        print("Calcul des moyennes mobiles...")
         # Moyennes mobiles
         df['SMA20'] = ta.trend.sma_indicator(df['Close'], window=20)
         df['SMA50'] = ta.trend.sma_indicator(df['Close'], window=50)
         
-        print("Calcul du MACD...")
         # MACD
         macd = ta.trend.MACD(df['Close'])
         df['MACD'] = macd.macd()
         df['MACD_Signal'] = macd.macd_signal()
         
-        print("Calcul du RSI...")
         # RSI
         df['RSI'] = ta.momentum.rsi(df['Close'])
         
-        print("Calcul des Bandes de Bollinger...")
         # Bollinger Bands
         bollinger = ta.volatility.BollingerBands(df['Close'])
         df['BB_Upper'] = bollinger.bollinger_hband()
         df['BB_Middle'] = bollinger.bollinger_mavg()
         df['BB_Lower'] = bollinger.bollinger_lband()
         
-        print("Calcul de l'ATR...")
         # ATR
         df['ATR'] = ta.volatility.average_true_range(df['High'], df['Low'], df['Close'])
         
-        print("Calcul du Stochastique...")
         # Stochastique
         stoch = ta.momentum.StochasticOscillator(df['High'], df['Low'], df['Close'])
         df['Stoch_K'] = stoch.stoch()
         df['Stoch_D'] = stoch.stoch_signal()
         
-        print("Calcul du Momentum...")
         # Momentum
         df['Momentum'] = ta.momentum.roc(df['Close'])
         
-        print("Calcul du VWAP...")
         # VWAP
         df['VWAP'] = (df['Close'] * df['Volume']).cumsum() / df['Volume'].cumsum()
         
-        print("Calcul du CRSI...")
         # CRSI (Comparaison avec SP500)
         close_returns = df['Close'].pct_change()
         sp500_returns = df['SP500'].pct_change()
         relative_returns = close_returns - sp500_returns
         df['CRSI'] = ta.momentum.rsi(pd.Series(relative_returns))
         
-        print("\nCalcul des indicateurs terminé")
-        print(f"Colonnes finales: {df.columns.tolist()}")
-        
         return df
         
     except Exception as e:
-        print(f"Erreur dans calculate_indicators: {str(e)}")
-        print("Traceback complet:")
-        import traceback
-        print(traceback.format_exc())
+        logger.exception("Erreur dans calculate_indicators: %s", e)
         raise
 
+# Ordre d'affichage des indicateurs et libellés des codes de signal
+SIGNAL_INDICATORS = ['SMA', 'MACD', 'RSI', 'BB', 'Stoch', 'Momentum', 'CRSI', 'VWAP']
+SIGNAL_LABELS = {1: 'Achat', -1: 'Vente', 0: 'Neutre'}
+
+
+def _signal_code(buy, sell):
+    """
+    Convertit deux masques booléens en codes int8 (+1 achat, -1 vente, 0 neutre).
+    """
+    return np.where(buy, 1, np.where(sell, -1, 0)).astype(np.int8)
+
+
+def compute_signal_codes(close, sma20, sma50, macd, macd_signal, rsi, bb_upper, bb_lower,
+                         stoch_k, stoch_d, momentum, crsi, vwap,
+                         rsi_low=30, rsi_high=70, stoch_low=20, stoch_high=80):
+    """
+    Évalue les règles de signal sur des tableaux NumPy (1-D ou 2-D) ou des scalaires.
+    Les comparaisons avec NaN sont fausses, comme dans l'ancienne version ligne par ligne.
+    Les seuils RSI et Stochastique sont paramétrables (valeurs par défaut: 30/70 et 20/80).
+    """
+    return {
+        'SMA': _signal_code((close > sma50) & (sma20 > sma50), (close < sma50) & (sma20 < sma50)),
+        'MACD': _signal_code(macd > macd_signal, np.logical_not(macd > macd_signal)),
+        'RSI': _signal_code(rsi < rsi_low, rsi > rsi_high),
+        'BB': _signal_code(close < bb_lower, close > bb_upper),
+        'Stoch': _signal_code((stoch_k < stoch_low) & (stoch_d < stoch_low),
+                              (stoch_k > stoch_high) & (stoch_d > stoch_high)),
+        'Momentum': _signal_code(momentum > 0, np.logical_not(momentum > 0)),
+        'CRSI': _signal_code(crsi < 30, crsi > 70),
+        'VWAP': _signal_code(close > vwap, np.logical_not(close > vwap))
+    }
+
+
+@instrumented('generate_signals')
 def generate_signals(df):
     """
     Génère les signaux de trading basés sur les indicateurs.
+    Une colonne int8 par indicateur (Signal_SMA, Signal_MACD, ...) et un score agrégé (Signal_Score).
     """
-    def get_signal_row(row):
-        try:
-            close = float(row['Close'].iloc[0]) if isinstance(row['Close'], pd.Series) else float(row['Close'])
-            sma20 = float(row['SMA20'].iloc[0]) if isinstance(row['SMA20'], pd.Series) else float(row['SMA20'])
-            sma50 = float(row['SMA50'].iloc[0]) if isinstance(row['SMA50'], pd.Series) else float(row['SMA50'])
-            macd = float(row['MACD'].iloc[0]) if isinstance(row['MACD'], pd.Series) else float(row['MACD'])
-            macd_signal = float(row['MACD_Signal'].iloc[0]) if isinstance(row['MACD_Signal'], pd.Series) else float(row['MACD_Signal'])
-            rsi = float(row['RSI'].iloc[0]) if isinstance(row['RSI'], pd.Series) else float(row['RSI'])
-            bb_upper = float(row['BB_Upper'].iloc[0]) if isinstance(row['BB_Upper'], pd.Series) else float(row['BB_Upper'])
-            bb_lower = float(row['BB_Lower'].iloc[0]) if isinstance(row['BB_Lower'], pd.Series) else float(row['BB_Lower'])
-            stoch_k = float(row['Stoch_K'].iloc[0]) if isinstance(row['Stoch_K'], pd.Series) else float(row['Stoch_K'])
-            stoch_d = float(row['Stoch_D'].iloc[0]) if isinstance(row['Stoch_D'], pd.Series) else float(row['Stoch_D'])
-            momentum = float(row['Momentum'].iloc[0]) if isinstance(row['Momentum'], pd.Series) else float(row['Momentum'])
-            crsi = float(row['CRSI'].iloc[0]) if isinstance(row['CRSI'], pd.Series) else float(row['CRSI'])
-            vwap = float(row['VWAP'].iloc[0]) if isinstance(row['VWAP'], pd.Series) else float(row['VWAP'])
-
-            return {
-                'SMA': 'Achat' if close > sma50 and sma20 > sma50 
-                       else 'Vente' if close < sma50 and sma20 < sma50 
-                       else 'Neutre',
-                'MACD': 'Achat' if macd > macd_signal else 'Vente',
-                'RSI': 'Achat' if rsi < 30 else 'Vente' if rsi > 70 else 'Neutre',
-                'BB': 'Achat' if close < bb_lower else 'Vente' if close > bb_upper else 'Neutre',
-                'Stoch': 'Achat' if stoch_k < 20 and stoch_d < 20 
-                         else 'Vente' if stoch_k > 80 and stoch_d > 80 
-                         else 'Neutre',
-                'Momentum': 'Achat' if momentum > 0 else 'Vente',
-                'CRSI': 'Achat' if crsi < 30 else 'Vente' if crsi > 70 else 'Neutre',
-                'VWAP': 'Achat' if close > vwap else 'Vente'
-            }
-
-        except Exception as e:
-            print(f"Erreur lors du calcul des signaux: {str(e)}")
-            return None
-
-    signals_list = [get_signal_row(df.loc[idx]) for idx in df.index]
-    df['Signals'] = signals_list
+    def col(name):
+        return df[name].to_numpy(dtype=np.float64)
+
+    codes = compute_signal_codes(
+        col('Close'), col('SMA20'), col('SMA50'), col('MACD'), col('MACD_Signal'), col('RSI'),
+        col('BB_Upper'), col('BB_Lower'), col('Stoch_K'), col('Stoch_D'), col('Momentum'),
+        col('CRSI'), col('VWAP')
+    )
+
+    for indicator in SIGNAL_INDICATORS:
+        df[f'Signal_{indicator}'] = codes[indicator]
+    df['Signal_Score'] = np.sum([codes[ind] for ind in SIGNAL_INDICATORS], axis=0).astype(np.int8)
     return df
 
 
-def create_visualization(df, ticker):
+def signal_labels(df, position=-1):
+    """
+    Retourne les libellés 'Achat'/'Vente'/'Neutre' d'une ligne pour l'affichage.
+    """
+    row = df.iloc[position]
+    return {ind: SIGNAL_LABELS[int(row[f'Signal_{ind}'])] for ind in SIGNAL_INDICATORS}
+
+
+def downsample_indices(values, max_points):
+    """
+    Sélectionne au plus max_points indices en conservant, dans chaque segment de la série,
+    le premier point, le minimum et le maximum (les pics restent visibles après réduction).
+    Les NaN sont ignorés pour le choix des extrêmes.
+    """
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+
+    n_buckets = max(max_points // 3, 1)
+    starts = np.linspace(0, n, n_buckets + 1).astype(np.int64)[:-1]
+    values = np.asarray(values, dtype=np.float64)
+    as_min = np.where(np.isnan(values), np.inf, values)
+    as_max = np.where(np.isnan(values), -np.inf, values)
+
+    # Position de l'extrême dans chaque segment via reduceat puis recherche de la première occurrence
+    bucket_of = np.repeat(np.arange(n_buckets), np.diff(np.append(starts, n)))
+    minima = np.minimum.reduceat(as_min, starts)
+    maxima = np.maximum.reduceat(as_max, starts)
+    is_min = as_min == minima[bucket_of]
+    is_max = as_max == maxima[bucket_of]
+    positions = np.arange(n)
+    first_min = np.minimum.reduceat(np.where(is_min, positions, n), starts)
+    first_max = np.minimum.reduceat(np.where(is_max, positions, n), starts)
+
+    indices = np.concatenate([starts, first_min, first_max, [n - 1]])
+    return np.unique(np.clip(indices, 0, n - 1))
+
+
+@instrumented('create_visualization')
+def create_visualization(df, ticker, show=True, light=False, max_points=5000, output_file=None):
     """
     Crée la visualisation des données et indicateurs.
+    Retourne la figure; show=False évite d'ouvrir le navigateur.
+    light=True utilise des traces WebGL et réduit chaque série à environ max_points points
+    (pour les longs historiques). output_file écrit la figure (.html, ou image via kaleido)
+    au lieu de l'afficher.
     """
     # Définition des couleurs personnalisées
     colors = {
@@ -207,55 +296,65 @@ def create_visualization(df, ticker):
             specs=[[{"secondary_y": True}]] + [[{"secondary_y": False}]] * 10
         )
 
+        # En mode léger: traces WebGL et séries réduites à max_points (extrêmes conservés)
+        Scatter = go.Scattergl if light else go.Scatter
+
+        def xy(column):
+            values = df[column].to_numpy()
+            if light and len(values) > max_points:
+                indices = downsample_indices(values, max_points)
+                return dict(x=df.index[indices], y=values[indices])
+            return dict(x=df.index, y=values)
+
         # Prix et Moyennes Mobiles
-        fig.add_trace(go.Scatter(x=df.index, y=df['Close'], name='Prix', line=dict(color=colors['prix'], width=2)), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['SMA20'], name='SMA20', line=dict(color=colors['sma20'])), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['SMA50'], name='SMA50', line=dict(color=colors['sma50'])), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['VWAP'], name='VWAP', line=dict(color=colors['vwap'], dash='dot')), row=1, col=1)
-        fig.add_trace(go.Bar(x=df.index, y=df['Volume'], name='Volume', marker_color=colors['volume'], opacity=0.3),
+        fig.add_trace(Scatter(**xy('Close'), name='Prix', line=dict(color=colors['prix'], width=2)), row=1, col=1)
+        fig.add_trace(Scatter(**xy('SMA20'), name='SMA20', line=dict(color=colors['sma20'])), row=1, col=1)
+        fig.add_trace(Scatter(**xy('SMA50'), name='SMA50', line=dict(color=colors['sma50'])), row=1, col=1)
+        fig.add_trace(Scatter(**xy('VWAP'), name='VWAP', line=dict(color=colors['vwap'], dash='dot')), row=1, col=1)
+        fig.add_trace(go.Bar(**xy('Volume'), name='Volume', marker_color=colors['volume'], opacity=0.3),
                      row=1, col=1, secondary_y=True)
 
         # MACD
-        fig.add_trace(go.Scatter(x=df.index, y=df['MACD'], name='MACD', line=dict(color=colors['macd'])), row=2, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['MACD_Signal'], name='Signal MACD', line=dict(color=colors['signal'])), row=2, col=1)
+        fig.add_trace(Scatter(**xy('MACD'), name='MACD', line=dict(color=colors['macd'])), row=2, col=1)
+        fig.add_trace(Scatter(**xy('MACD_Signal'), name='Signal MACD', line=dict(color=colors['signal'])), row=2, col=1)
 
         # RSI
-        fig.add_trace(go.Scatter(x=df.index, y=df['RSI'], name='RSI', line=dict(color=colors['prix'])), row=3, col=1)
+        fig.add_trace(Scatter(**xy('RSI'), name='RSI', line=dict(color=colors['prix'])), row=3, col=1)
         fig.add_hline(y=70, line_dash="dash", line_color="#E74C3C", row=3, col=1)  # Rouge
         fig.add_hline(y=30, line_dash="dash", line_color="#27AE60", row=3, col=1)  # Vert
 
         # Bollinger Bands
-        fig.add_trace(go.Scatter(x=df.index, y=df['Close'], name='Prix', line=dict(color=colors['prix'])), row=4, col=1)
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df['BB_Upper'],
+        fig.add_trace(Scatter(**xy('Close'), name='Prix', line=dict(color=colors['prix'])), row=4, col=1)
+        fig.add_trace(Scatter(
+            **xy('BB_Upper'),
             name='BB Sup',
             line=dict(color=colors['bb_bands'], dash='dash'),
             fill=None
         ), row=4, col=1)
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df['BB_Lower'],
+        fig.add_trace(Scatter(
+            **xy('BB_Lower'),
             name='BB Inf',
             line=dict(color=colors['bb_bands'], dash='dash'),
-            fill='tonexty',
+            fill=None if light else 'tonexty',  # Le remplissage suppose des abscisses identiques
             fillcolor='rgba(149, 165, 166, 0.2)'  # Gris transparent
         ), row=4, col=1)
 
         # ATR et VIX
-        fig.add_trace(go.Scatter(x=df.index, y=df['ATR'], name='ATR', line=dict(color=colors['prix'])), row=5, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['VIX'], name='VIX', line=dict(color='#E74C3C')), row=5, col=1)
+        fig.add_trace(Scatter(**xy('ATR'), name='ATR', line=dict(color=colors['prix'])), row=5, col=1)
+        fig.add_trace(Scatter(**xy('VIX'), name='VIX', line=dict(color='#E74C3C')), row=5, col=1)
 
         # Stochastique
-        fig.add_trace(go.Scatter(x=df.index, y=df['Stoch_K'], name='Stoch K', line=dict(color=colors['stoch_k'])), row=6, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['Stoch_D'], name='Stoch D', line=dict(color=colors['stoch_d'])), row=6, col=1)
+        fig.add_trace(Scatter(**xy('Stoch_K'), name='Stoch K', line=dict(color=colors['stoch_k'])), row=6, col=1)
+        fig.add_trace(Scatter(**xy('Stoch_D'), name='Stoch D', line=dict(color=colors['stoch_d'])), row=6, col=1)
         fig.add_hline(y=80, line_dash="dash", line_color="#E74C3C", row=6, col=1)  # Rouge
         fig.add_hline(y=20, line_dash="dash", line_color="#27AE60", row=6, col=1)  # Vert
 
         # Momentum
-        fig.add_trace(go.Scatter(x=df.index, y=df['Momentum'], name='Momentum', line=dict(color=colors['prix'])), row=7, col=1)
+        fig.add_trace(Scatter(**xy('Momentum'), name='Momentum', line=dict(color=colors['prix'])), row=7, col=1)
         fig.add_hline(y=0, line_dash="dash", line_color="#2C3E50", row=7, col=1)  # Gris foncé
 
         # CRSI
-        fig.add_trace(go.Scatter(x=df.index, y=df['CRSI'], name='CRSI', line=dict(color=colors['prix'])), row=8, col=1)
+        fig.add_trace(Scatter(**xy('CRSI'), name='CRSI', line=dict(color=colors['prix'])), row=8, col=1)
         fig.add_hline(y=70, line_dash="dash", line_color="#E74C3C", row=8, col=1)  # Rouge
         fig.add_hline(y=30, line_dash="dash", line_color="#27AE60", row=8, col=1)  # Vert
 
@@ -264,54 +363,44 @@ def create_visualization(df, ticker):
         low_price = df['Low'].min()
         diff = high_price - low_price
         
-        fig.add_trace(go.Scatter(x=df.index, y=df['Close'], name='Prix', line=dict(color=colors['prix'])), row=9, col=1)
+        fig.add_trace(Scatter(**xy('Close'), name='Prix', line=dict(color=colors['prix'])), row=9, col=1)
         
         fib_levels = [0.236, 0.382, 0.5, 0.618]
         fib_colors = ['#E74C3C', '#F39C12', '#F1C40F', '#27AE60']  # Rouge, Orange, Jaune, Vert
         
+        # Niveaux constants dessinés comme formes plutôt que comme séries de N points
         for level, color in zip(fib_levels, fib_colors):
             fib_value = high_price - level * diff
-            fig.add_trace(
-                go.Scatter(
-                    x=df.index,
-                    y=[fib_value] * len(df.index),
-                    name=f'Fib {level*100}%',
-                    line=dict(color=color, dash='dash')
-                ),
+            fig.add_hline(
+                y=fib_value, line_dash="dash", line_color=color,
+                annotation_text=f'Fib {level*100}%', annotation_position="top left",
                 row=9, col=1
             )
 
         # Indices
-        fig.add_trace(go.Scatter(x=df.index, y=df['SP500'], name='S&P 500', line=dict(color=colors['sp500'])), row=10, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['NASDAQ'], name='NASDAQ', line=dict(color=colors['nasdaq'])), row=10, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['DOW'], name='Dow Jones', line=dict(color=colors['dow'])), row=10, col=1)
-
-        # Signaux
-        for i, indicator in enumerate(['SMA', 'MACD', 'RSI', 'BB', 'Stoch', 'Momentum', 'CRSI', 'VWAP']):
-            y_pos = i / 8
-            signals = []
-            for s in df['Signals']:
-                if isinstance(s, dict):
-                    signal_value = s.get(indicator, 'Neutre')
-                    signals.append(1 if signal_value == 'Achat' else -1 if signal_value == 'Vente' else 0)
-                else:
-                    signals.append(0)
-                    
-            fig.add_trace(
-                go.Scatter(
-                    x=df.index,
-                    y=[y_pos] * len(signals),
-                    mode='markers',
-                    marker=dict(
-                        size=8,
-                        color=signals,
-                        colorscale=[[0, '#E74C3C'], [0.5, '#F4D03F'], [1, '#27AE60']],  # Rouge, Jaune, Vert
-                        showscale=False
-                    ),
-                    name=indicator
-                ),
-                row=11, col=1
-            )
+        fig.add_trace(Scatter(**xy('SP500'), name='S&P 500', line=dict(color=colors['sp500'])), row=10, col=1)
+        fig.add_trace(Scatter(**xy('NASDAQ'), name='NASDAQ', line=dict(color=colors['nasdaq'])), row=10, col=1)
+        fig.add_trace(Scatter(**xy('DOW'), name='Dow Jones', line=dict(color=colors['dow'])), row=10, col=1)
+
+        # Signaux: une carte de chaleur (indicateur x temps) construite directement depuis les codes
+        codes = df[[f'Signal_{ind}' for ind in SIGNAL_INDICATORS]].to_numpy()
+        x = df.index
+        if light and len(codes) > max_points:
+            indices = np.linspace(0, len(codes) - 1, max_points).astype(np.int64)
+            codes, x = codes[indices], x[indices]
+        fig.add_trace(
+            go.Heatmap(
+                x=x,
+                y=SIGNAL_INDICATORS,
+                z=codes.T,
+                zmin=-1,
+                zmax=1,
+                colorscale=[[0, '#E74C3C'], [0.5, '#F4D03F'], [1, '#27AE60']],  # Rouge, Jaune, Vert
+                showscale=False,
+                name='Signaux'
+            ),
+            row=11, col=1
+        )
 
 
         # Mise à jour du layout avec fond bleu clair
@@ -358,39 +447,41 @@ def create_visualization(df, ticker):
             fig.update_xaxes(row=i, col=1, gridcolor='rgba(255, 255, 255, 0.5)')
             fig.update_yaxes(row=i, col=1, gridcolor='rgba(255, 255, 255, 0.5)')
 
-        fig.show()
+        if output_file is not None:
+            if output_file.endswith('.html'):
+                fig.write_html(output_file, include_plotlyjs='cdn')
+            else:
+                fig.write_image(output_file)
+        elif show:
+            fig.show()
+        return fig
 
     except Exception as e:
-        print(f"Erreur lors de la création du graphique: {e}")
+        logger.exception("Erreur lors de la création du graphique: %s", e)
                
+@instrumented('print_summary')
 def print_summary(df):
     """
     Affiche le résumé des analyses et recommandations.
     """
     try:
-        last_row = df.iloc[-1]
         print("\nVérification des signaux:")
-        signals = last_row['Signals']
-        
-        # Si signals est une Series, prendre sa valeur
-        if isinstance(signals, pd.Series):
-            signals = signals.iloc[0]
-            
-        if not isinstance(signals, dict):
-            print(f"Format incorrect des signaux: {type(signals)}")
-            print(f"Contenu: {signals}")
+        missing = [f'Signal_{ind}' for ind in SIGNAL_INDICATORS if f'Signal_{ind}' not in df.columns]
+        if missing:
+            logger.error("Colonnes de signaux manquantes: %s", missing)
             raise ValueError("Les signaux ne sont pas dans le format attendu")
-            
+
+        signals = signal_labels(df)
+
         # Compter les signaux
         buy_signals = sum(1 for s in signals.values() if s == 'Achat')
         sell_signals = sum(1 for s in signals.values() if s == 'Vente')
         neutral_signals = sum(1 for s in signals.values() if s == 'Neutre')
         
         # Création du tableau de résultats
-        indicators = ['SMA', 'MACD', 'RSI', 'BB', 'Stoch', 'Momentum', 'CRSI', 'VWAP']
         results_df = pd.DataFrame({
-            'Indicateur': indicators,
-            'Signal': [signals[ind] for ind in indicators]
+            'Indicateur': SIGNAL_INDICATORS,
+            'Signal': [signals[ind] for ind in SIGNAL_INDICATORS]
         })
         
         print("\nRésumé des signaux:")
@@ -400,39 +491,175 @@ def print_summary(df):
         print(f"Signaux neutres: {neutral_signals}")
         
     except Exception as e:
-        print(f"Erreur dans print_summary: {str(e)}")
-        print("Traceback complet:")
-        import traceback
-        print(traceback.format_exc())
+        logger.exception("Erreur dans print_summary: %s", e)
         raise
 
-def run_analysis(ticker="NVDA", days=180):
+def run_analysis(ticker="NVDA", days=180, source=None, backend='ta', light=False, output_file=None,
+                 compact=False):
     """
     Fonction principale qui orchestre l'analyse complète.
+    compact=True retourne la version compacte du DataFrame (voir compact_frame).
     """
     try:
         # Étape 1: Préparation des données
-        df = prepare_data(ticker, days)
+        df = prepare_data(ticker, days, source=source)
         
         # Étape 2: Calcul des indicateurs
-        df = calculate_indicators(df)
+        df = calculate_indicators(df, backend=backend)
         
         # Étape 3: Génération des signaux
         df = generate_signals(df)
         
         # Étape 4: Création de la visualisation
-        create_visualization(df, ticker)
+        create_visualization(df, ticker, light=light, output_file=output_file)
         
         # Étape 5: Affichage du résumé
         print_summary(df)
         
+        if compact:
+            df = compact_frame(df)
+            logger.info("Empreinte mémoire de %s: %.1f Ko", ticker, memory_footprint(df) / 1024)
         return df
         
     except Exception as e:
-        print(f"Une erreur est survenue: {str(e)}")
+        logger.error("Une erreur est survenue: %s", e)
         raise
 
+
+# Colonnes d'indicateurs produites par calculate_indicators et colonnes de référence partagées
+INDICATOR_COLUMNS = ['SMA20', 'SMA50', 'MACD', 'MACD_Signal', 'RSI', 'BB_Upper', 'BB_Middle', 'BB_Lower',
+                     'ATR', 'Stoch_K', 'Stoch_D', 'Momentum', 'VWAP', 'CRSI']
+REFERENCE_COLUMNS = ['VIX', 'SP500', 'NASDAQ', 'DOW']
+
+
+def compact_frame(df):
+    """
+    Version compacte d'un DataFrame analysé: indicateurs en float32, signaux en int8,
+    sans les colonnes de référence (conservées une seule fois dans un ResultStore).
+    Les indicateurs sont calculés en float64 puis arrondis: l'écart relatif reste
+    inférieur à 2**-24 (~6e-8); les signaux, calculés avant l'arrondi, sont identiques.
+    """
+    df = df.drop(columns=[col for col in REFERENCE_COLUMNS if col in df.columns])
+    casts = {col: np.float32 for col in INDICATOR_COLUMNS if col in df.columns}
+    casts.update({col: np.int8 for col in df.columns if col.startswith('Signal_')})
+    return df.astype(casts)
+
+
+def memory_footprint(df):
+    """
+    Mémoire occupée par un DataFrame, index compris (octets).
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class ResultStore:
+    """
+    Résultats compacts de plusieurs tickers avec un seul exemplaire des séries de référence.
+    """
+
+    def __init__(self, references=None):
+        self.references = references or {}
+        self.frames = {}
+
+    def add(self, ticker, df):
+        self.frames[ticker] = compact_frame(df)
+
+    def frame(self, ticker, with_references=True):
+        """
+        Retourne le DataFrame d'un ticker, avec les références réalignées si demandé.
+        """
+        df = self.frames[ticker]
+        if with_references and self.references:
+            df = attach_references(df.copy(), self.references)
+        return df
+
+    def footprint(self):
+        """
+        Mémoire par ticker (Ko) et part des références partagées.
+        """
+        table = pd.DataFrame(
+            {'Mémoire (Ko)': [memory_footprint(df) / 1024 for df in self.frames.values()]},
+            index=pd.Index(list(self.frames), name='Ticker')
+        )
+        shared = sum(series.memory_usage(index=True, deep=True) for series in self.references.values())
+        table.attrs['references_ko'] = shared / 1024
+        return table
+
+
+def _analyze_ticker(ticker, df, backend='ta', keep_frame=False):
+    """
+    Calcule indicateurs et signaux d'un ticker et retourne (ligne de résumé, DataFrame compact ou None).
+    Fonction de niveau module pour pouvoir être exécutée dans un processus séparé.
+    """
+    try:
+        df = generate_signals(calculate_indicators(df, backend=backend))
+        signals = signal_labels(df)
+        row = {'Ticker': ticker, 'Close': float(df['Close'].iloc[-1]), 'Date': df.index[-1]}
+        row.update(signals)
+        row['Achat'] = sum(1 for s in signals.values() if s == 'Achat')
+        row['Vente'] = sum(1 for s in signals.values() if s == 'Vente')
+        row['Neutre'] = sum(1 for s in signals.values() if s == 'Neutre')
+        row['Score'] = int(df['Signal_Score'].iloc[-1])
+        row['Erreur'] = None
+        return row, compact_frame(df) if keep_frame else None
+    except Exception as e:
+        logger.debug("Erreur d'analyse pour %s", ticker, exc_info=True)
+        return {'Ticker': ticker, 'Erreur': str(e)}, None
+
+
+def run_batch(tickers, days=180, workers=None, source=None, backend='ta', verbose=False, store=None):
+    """
+    Analyse plusieurs tickers: téléchargement groupé des symboles et des indices de référence,
+    séries de référence partagées, calculs répartis sur un pool de processus.
+    Retourne un DataFrame de résumé indexé par ticker (affiché dans la console si verbose=True).
+    Si un ResultStore est fourni, les DataFrames compacts de chaque ticker y sont conservés.
+    """
+    source = source or YahooDataSource()
+    tickers = list(dict.fromkeys(tickers))
+    start_date, end_date = _date_range(days)
+
+    INSTRUMENTATION.count('tickers', len(tickers))
+    with INSTRUMENTATION.stage('download'):
+        frames = source.download(tickers + list(REFERENCE_SYMBOLS.values()), start_date, end_date)
+    references = _reference_closes(frames)
+    keep_frame = store is not None
+    if keep_frame:
+        store.references = references
+
+    jobs = []
+    rows = []
+    for ticker in tickers:
+        df = frames.get(ticker)
+        if df is None or df.empty:
+            rows.append({'Ticker': ticker, 'Erreur': f"Pas de données trouvées pour {ticker}"})
+            continue
+        jobs.append((ticker, attach_references(df.copy(), references)))
+
+    with INSTRUMENTATION.stage('analyze'):
+        if workers is not None and workers <= 1:
+            results = [_analyze_ticker(ticker, df, backend, keep_frame) for ticker, df in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_analyze_ticker, ticker, df, backend, keep_frame) for ticker, df in jobs]
+                results = [future.result() for future in futures]
+
+    for row, frame in results:
+        rows.append(row)
+        if frame is not None:
+            store.frames[row['Ticker']] = frame
+
+    columns = ['Ticker', 'Date', 'Close'] + SIGNAL_INDICATORS + ['Achat', 'Vente', 'Neutre', 'Score', 'Erreur']
+    summary = pd.DataFrame(rows, columns=columns).set_index('Ticker').reindex(tickers)
+
+    failed = summary['Erreur'].notna().sum()
+    if failed:
+        logger.warning("%d ticker(s) sur %d en erreur", failed, len(tickers))
+    if verbose:
+        print(summary.to_string())
+    return summary
+
 if __name__ == "__main__":
+    configure_logging(logging.INFO)
     #run_analysis(ticker="NVDA", days=180)
-    run_analysis(ticker="TSLA", days=180)
+    run_analysis(ticker="TSLA", days=180, source=CachedDataSource(ConcurrentDataSource()))
     input("Appuyez sur Entrée pour fermer le programme...")
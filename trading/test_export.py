@@ -0,0 +1,35 @@
+"""
+Export incrémental et remplacement des indicateurs, y compris pour des tickers dont le nom
+est encodé dans les dossiers de partition (^GSPC, EURUSD=X) ou purement numérique (7203).
+
+Usage: python -m pytest test_export.py
+"""
+import pytest
+
+import benchmarks
+from export import export_indicators, read_indicators
+from technical_analisis import calculate_indicators, generate_signals, prepare_data
+
+
+def _analyzed(n_bars=800):
+    source, tickers, days = benchmarks.synthetic_universe(1, n_bars, freq='D')
+    return generate_signals(calculate_indicators(prepare_data(tickers[0], days, source=source)))
+
+
+@pytest.mark.parametrize('fmt', ['parquet', 'ipc'])
+@pytest.mark.parametrize('ticker', ['^GSPC', 'EURUSD=X', '7203'])
+def test_append_and_replace(tmp_path, fmt, ticker):
+    df = _analyzed()
+    root = tmp_path / 'export'
+
+    assert export_indicators({ticker: df.iloc[:200]}, root, fmt=fmt) == {ticker: 200}
+    assert export_indicators({ticker: df.iloc[:500]}, root, fmt=fmt) == {ticker: 300}
+    assert export_indicators({ticker: df}, root, fmt=fmt) == {ticker: 300}
+    assert export_indicators({ticker: df}, root, fmt=fmt) == {ticker: 0}
+    result = read_indicators(root, tickers=[ticker], fmt=fmt)
+    assert len(result) == len(df) and not result.index.duplicated().any()
+
+    export_indicators({ticker: df.iloc[-100:]}, root, fmt=fmt, append=False)
+    result = read_indicators(root, fmt=fmt)
+    assert len(result) == 100
+    assert list(result.index.get_level_values('ticker').unique()) == [ticker]
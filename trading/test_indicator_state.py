@@ -0,0 +1,40 @@
+"""
+L'état incrémental doit suivre le calcul par lot (calculate_indicators + generate_signals)
+barre par barre, y compris quand des barres ou des champs manquent.
+
+Usage: python -m pytest test_indicator_state.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+import benchmarks
+from indicator_state import IndicatorState
+from technical_analisis import calculate_indicators, generate_signals, prepare_data
+
+
+def _history(n_bars=400):
+    source, tickers, days = benchmarks.synthetic_universe(1, n_bars, freq='D')
+    return prepare_data(tickers[0], days, source=source)
+
+
+def _with_missing_values(df):
+    df = df.copy()
+    df.iloc[5, df.columns.get_loc('High')] = np.nan
+    df.iloc[100, df.columns.get_loc('Close')] = np.nan
+    df.iloc[250, df.columns.get_loc('Volume')] = np.nan
+    df.iloc[300, [df.columns.get_loc(col) for col in ['Close', 'High', 'Low', 'Volume']]] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('prepare', [lambda df: df, _with_missing_values], ids=['clean', 'missing'])
+def test_state_matches_batch(prepare):
+    df = prepare(_history())
+    expected = generate_signals(calculate_indicators(df.copy()))
+
+    state = IndicatorState.from_history(df.iloc[:50])
+    rows = pd.DataFrame([state.update(df.iloc[i]) for i in range(50, len(df))], index=df.index[50:])
+    for column in rows.columns:
+        np.testing.assert_allclose(rows[column].to_numpy(dtype=np.float64),
+                                   expected[column].iloc[50:].to_numpy(dtype=np.float64),
+                                   rtol=1e-9, atol=1e-9, err_msg=column)
@@ -0,0 +1,38 @@
+"""
+Le mode panel doit donner, ticker par ticker, les mêmes indicateurs et signaux que l'analyse
+individuelle, y compris pour un univers non aligné (cotation tardive, barres manquantes).
+
+Usage: python -m pytest test_panel.py
+"""
+import numpy as np
+
+import benchmarks
+from panel import load_panel
+from technical_analisis import SIGNAL_INDICATORS, calculate_indicators, generate_signals, prepare_data
+
+
+def _staggered_universe():
+    source, tickers, days = benchmarks.synthetic_universe(4, 400, freq='D')
+    frames = source.frames
+    frames[tickers[1]] = frames[tickers[1]].iloc[150:]
+    frames[tickers[2]] = frames[tickers[2]].drop(frames[tickers[2]].index[[200]])
+    frames[tickers[3]] = frames[tickers[3]].drop(frames[tickers[3]].index[[10, 300, 301]])
+    return source, tickers, days
+
+
+def test_panel_matches_single_ticker_on_staggered_universe():
+    source, tickers, days = _staggered_universe()
+    panel = load_panel(tickers, days, source)
+    panel.compute_signals()
+    summary = panel.summary()
+
+    for j, ticker in enumerate(tickers):
+        single = generate_signals(calculate_indicators(prepare_data(ticker, days, source=source), backend='ta'))
+        rows = panel.index.get_indexer(single.index)
+        for name, values in panel.indicators.items():
+            np.testing.assert_allclose(values[rows, j], single[name].to_numpy(dtype=np.float64),
+                                       rtol=1e-8, atol=1e-8, err_msg=f"{ticker} {name}")
+        for indicator in SIGNAL_INDICATORS:
+            np.testing.assert_array_equal(panel.signals[indicator][rows, j], single[f'Signal_{indicator}'].to_numpy(),
+                                          err_msg=f"{ticker} {indicator}")
+        assert summary.loc[ticker, 'Score'] == single['Signal_Score'].iloc[-1]
@@ -0,0 +1,30 @@
+"""
+Avec les paramètres par défaut, le score d'une combinaison de la recherche doit être celui
+de generate_signals, y compris sur une série comportant des clôtures manquantes.
+
+Usage: python -m pytest test_parameter_sweep.py
+"""
+import numpy as np
+import pytest
+
+import benchmarks
+from parameter_sweep import PRICE_COLUMNS, SweepBlocks
+from technical_analisis import calculate_indicators, generate_signals, prepare_data
+
+# Valeurs codées dans calculate_indicators et compute_signal_codes
+DEFAULT_PARAMS = {
+    'sma_fast': 20, 'sma_slow': 50, 'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9,
+    'rsi_window': 14, 'rsi_low': 30, 'rsi_high': 70, 'bb_window': 20, 'bb_dev': 2.0,
+    'stoch_window': 14, 'stoch_low': 20, 'stoch_high': 80
+}
+
+
+@pytest.mark.parametrize('missing', [[], [100, 700, 701]])
+def test_default_params_match_generate_signals(missing):
+    source, tickers, days = benchmarks.synthetic_universe(1, 1500, freq='D')
+    df = prepare_data(tickers[0], days, source=source)
+    df.iloc[missing, df.columns.get_loc('Close')] = np.nan
+
+    expected = generate_signals(calculate_indicators(df.copy()))['Signal_Score'].to_numpy()
+    blocks = SweepBlocks(np.vstack([df[col].to_numpy(dtype=np.float64) for col in PRICE_COLUMNS]))
+    np.testing.assert_array_equal(blocks.score(DEFAULT_PARAMS), expected)
@@ -0,0 +1,69 @@
+"""
+Parité des signaux vectorisés (generate_signals) avec les anciennes règles ligne par ligne
+de get_signal_row, pour SMA, MACD, RSI, BB, Stoch, Momentum, CRSI et VWAP.
+
+Usage: python -m pytest test_signals.py
+"""
+import numpy as np
+
+import benchmarks
+from technical_analisis import (
+    SIGNAL_INDICATORS, SIGNAL_LABELS, calculate_indicators, generate_signals, prepare_data, signal_labels
+)
+
+
+def get_signal_row(row):
+    """
+    Règles de l'ancienne version, évaluées sur une ligne (les comparaisons avec NaN sont fausses).
+    """
+    close, sma20, sma50 = float(row['Close']), float(row['SMA20']), float(row['SMA50'])
+    macd, macd_signal, rsi = float(row['MACD']), float(row['MACD_Signal']), float(row['RSI'])
+    bb_upper, bb_lower = float(row['BB_Upper']), float(row['BB_Lower'])
+    stoch_k, stoch_d = float(row['Stoch_K']), float(row['Stoch_D'])
+    momentum, crsi, vwap = float(row['Momentum']), float(row['CRSI']), float(row['VWAP'])
+    return {
+        'SMA': 'Achat' if close > sma50 and sma20 > sma50
+               else 'Vente' if close < sma50 and sma20 < sma50
+               else 'Neutre',
+        'MACD': 'Achat' if macd > macd_signal else 'Vente',
+        'RSI': 'Achat' if rsi < 30 else 'Vente' if rsi > 70 else 'Neutre',
+        'BB': 'Achat' if close < bb_lower else 'Vente' if close > bb_upper else 'Neutre',
+        'Stoch': 'Achat' if stoch_k < 20 and stoch_d < 20
+                 else 'Vente' if stoch_k > 80 and stoch_d > 80
+                 else 'Neutre',
+        'Momentum': 'Achat' if momentum > 0 else 'Vente',
+        'CRSI': 'Achat' if crsi < 30 else 'Vente' if crsi > 70 else 'Neutre',
+        'VWAP': 'Achat' if close > vwap else 'Vente'
+    }
+
+
+def _indicator_frame():
+    """
+    Indicateurs d'une série synthétique (période de chauffe NaN incluse), avec des lignes
+    NaN et des valeurs exactement sur les seuils ajoutées à la main.
+    """
+    source, tickers, days = benchmarks.synthetic_universe(1, 300, freq='D')
+    df = calculate_indicators(prepare_data(tickers[0], days, source=source))
+    df.loc[df.index[100], ['RSI', 'CRSI', 'Stoch_K']] = np.nan
+    df.loc[df.index[101], 'Close'] = np.nan
+    df.loc[df.index[102], ['SMA20', 'SMA50', 'MACD', 'Momentum', 'VWAP', 'BB_Upper', 'BB_Lower']] = np.nan
+    df.loc[df.index[110], ['RSI', 'CRSI', 'Stoch_K', 'Stoch_D', 'Momentum']] = [30.0, 70.0, 20.0, 20.0, 0.0]
+    df.loc[df.index[111], ['RSI', 'CRSI', 'Stoch_K', 'Stoch_D']] = [70.0, 30.0, 80.0, 80.0]
+    df.loc[df.index[112], 'MACD_Signal'] = df.loc[df.index[112], 'MACD']
+    df.loc[df.index[113], 'VWAP'] = df.loc[df.index[113], 'Close']
+    df.loc[df.index[114], 'SMA20'] = df.loc[df.index[114], 'SMA50']
+    return df
+
+
+def test_generate_signals_matches_row_rules():
+    df = generate_signals(_indicator_frame())
+    assert df[[f'Signal_{ind}' for ind in SIGNAL_INDICATORS]].isna().sum().sum() == 0
+
+    for position in range(len(df)):
+        expected = get_signal_row(df.iloc[position])
+        assert signal_labels(df, position) == expected, df.index[position]
+
+    codes = {label: code for code, label in SIGNAL_LABELS.items()}
+    for position in [0, 100, 101, 102, 110, 111, len(df) - 1]:
+        expected = get_signal_row(df.iloc[position])
+        assert df['Signal_Score'].iloc[position] == sum(codes[expected[ind]] for ind in SIGNAL_INDICATORS)
@@ -0,0 +1,214 @@
+"""
+Service de surveillance d'une liste de tickers: réévalue les signaux à intervalle régulier
+et publie les changements de signal (ex. RSI passant de 'Neutre' à 'Achat') vers des sorties
+interchangeables (fichier, file asyncio, webhook local).
+
+Usage: python watchlist_daemon.py
+"""
+import asyncio
+import json
+import time
+import urllib.request
+
+from data_sources import REFERENCE_SYMBOLS, ConcurrentDataSource
+from instrumentation import configure_logging, get_logger
+from technical_analisis import (
+    SIGNAL_INDICATORS, SIGNAL_LABELS, _date_range, _reference_closes, attach_references,
+    calculate_indicators, generate_signals
+)
+
+logger = get_logger('watchlist_daemon')
+
+
+class FileSink:
+    """
+    Ajoute chaque événement sous forme d'une ligne JSON dans un fichier.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    async def emit(self, event):
+        line = json.dumps(event, default=str) + '\n'
+        await asyncio.to_thread(self._append, line)
+
+    def _append(self, line):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+
+class QueueSink:
+    """
+    Dépose les événements dans une asyncio.Queue consommée par une autre tâche.
+    """
+
+    def __init__(self, queue=None):
+        self.queue = queue or asyncio.Queue()
+
+    async def emit(self, event):
+        await self.queue.put(event)
+
+
+class WebhookSink:
+    """
+    Envoie chaque événement en POST JSON vers une URL (typiquement un service local).
+    """
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    async def emit(self, event):
+        await asyncio.to_thread(self._post, json.dumps(event, default=str).encode('utf-8'))
+
+    def _post(self, body):
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class WatchlistDaemon:
+    """
+    Boucle asyncio qui, à chaque cycle, télécharge les prix de la liste avec une concurrence bornée,
+    ne recalcule indicateurs et signaux que pour les tickers dont les données ont changé
+    et publie les transitions de signal vers les sinks.
+    """
+
+    def __init__(self, tickers, interval=300, days=180, source=None, sinks=(), max_concurrency=5, backend='numpy'):
+        self.tickers = list(dict.fromkeys(tickers))
+        self.interval = interval
+        self.days = days
+        self.source = source or ConcurrentDataSource()
+        self.sinks = list(sinks)
+        self.max_concurrency = max_concurrency
+        self.backend = backend
+        self.fingerprints = {}
+        self.last_codes = {}
+        self.metrics = []
+        self._stopped = asyncio.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    @staticmethod
+    def _fingerprint(df):
+        """
+        Identifie l'état des données: nombre de barres et dernière barre.
+        """
+        last = df.iloc[-1]
+        return len(df), df.index[-1], float(last['Close']), float(last['Volume'])
+
+    async def _emit(self, event):
+        for sink in self.sinks:
+            try:
+                await sink.emit(event)
+            except Exception as e:
+                logger.warning("Échec de publication vers %s: %s", type(sink).__name__, e)
+
+    async def _process(self, ticker, references, start_date, end_date, semaphore, stats):
+        """
+        Télécharge un ticker, recalcule ses signaux si ses données ont changé et publie les transitions.
+        """
+        async with semaphore:
+            # Attente avant prise en charge: au-delà de l'intervalle, le ticker compte dans le backlog
+            wait = time.perf_counter() - stats['started']
+            stats['max_wait_s'] = max(stats['max_wait_s'], wait)
+            if wait > self.interval:
+                stats['backlog'] += 1
+            frames = await asyncio.to_thread(self.source.download, [ticker], start_date, end_date)
+            df = frames.get(ticker)
+            if df is None or df.empty:
+                raise ValueError(f"Pas de données trouvées pour {ticker}")
+
+            fingerprint = self._fingerprint(df)
+            if self.fingerprints.get(ticker) == fingerprint:
+                stats['skipped'] += 1
+                return
+
+            df = attach_references(df.copy(), references)
+            df = await asyncio.to_thread(lambda: generate_signals(calculate_indicators(df, backend=self.backend)))
+            self.fingerprints[ticker] = fingerprint
+            stats['recomputed'] += 1
+
+        last = df.iloc[-1]
+        codes = {ind: int(last[f'Signal_{ind}']) for ind in SIGNAL_INDICATORS}
+        previous = self.last_codes.get(ticker)
+        self.last_codes[ticker] = codes
+        if previous is None:
+            return
+
+        for indicator in SIGNAL_INDICATORS:
+            if codes[indicator] != previous[indicator]:
+                stats['transitions'] += 1
+                await self._emit({
+                    'ticker': ticker,
+                    'indicator': indicator,
+                    'from': SIGNAL_LABELS[previous[indicator]],
+                    'to': SIGNAL_LABELS[codes[indicator]],
+                    'date': df.index[-1],
+                    'close': float(last['Close']),
+                    'score': int(last['Signal_Score'])
+                })
+
+    async def run_cycle(self):
+        """
+        Exécute un cycle complet et retourne ses métriques.
+        """
+        start = time.perf_counter()
+        start_date, end_date = _date_range(self.days)
+        stats = {'started': start, 'max_wait_s': 0.0, 'backlog': 0,
+                 'skipped': 0, 'recomputed': 0, 'transitions': 0, 'errors': 0}
+
+        frames = await asyncio.to_thread(self.source.download, list(REFERENCE_SYMBOLS.values()), start_date, end_date)
+        references = _reference_closes(frames)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = [self._process(ticker, references, start_date, end_date, semaphore, stats) for ticker in self.tickers]
+        for ticker, result in zip(self.tickers, await asyncio.gather(*tasks, return_exceptions=True)):
+            if isinstance(result, Exception):
+                stats['errors'] += 1
+                logger.warning("Erreur pour %s: %s", ticker, result)
+
+        latency = time.perf_counter() - start
+        metrics = {
+            'cycle': len(self.metrics) + 1,
+            'latency_s': latency,
+            'tickers': len(self.tickers),
+            'recomputed': stats['recomputed'],
+            'skipped': stats['skipped'],
+            'transitions': stats['transitions'],
+            'errors': stats['errors'],
+            'max_wait_s': stats['max_wait_s'],
+            'backlog': stats['backlog'],
+            # Retard accumulé: temps de cycle au-delà de l'intervalle prévu
+            'overrun_s': max(0.0, latency - self.interval)
+        }
+        self.metrics.append(metrics)
+        logger.info("Cycle %(cycle)d: %(latency_s).2f s, %(recomputed)d recalculés, %(skipped)d inchangés, "
+                    "%(transitions)d transitions, %(errors)d erreurs, backlog %(backlog)d", metrics)
+        return metrics
+
+    async def run(self, cycles=None):
+        """
+        Enchaîne les cycles toutes les `interval` secondes jusqu'à stop() ou `cycles` cycles.
+        """
+        completed = 0
+        while not self._stopped.is_set() and (cycles is None or completed < cycles):
+            metrics = await self.run_cycle()
+            completed += 1
+            if cycles is not None and completed >= cycles:
+                break
+            delay = max(0.0, self.interval - metrics['latency_s'])
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        return self.metrics
+
+
+if __name__ == "__main__":
+    import logging
+
+    configure_logging(logging.INFO)
+    daemon = WatchlistDaemon(["TSLA", "NVDA", "AAPL", "MSFT"], interval=300, sinks=[FileSink("signal_transitions.jsonl")])
+    asyncio.run(daemon.run())